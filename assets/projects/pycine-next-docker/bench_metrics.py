@@ -0,0 +1,95 @@
+"""
+Micro-benchmark of the metrics middleware overhead.
+
+Calls the `root` route in-process (no server, no sockets) on an app without
+middleware and on the same app with `MetricsMiddleware`, in interleaved
+rounds, and reports the cost per request.
+
+    python bench_metrics.py --requests 20000 --size 1024
+"""
+import time
+import asyncio
+import argparse
+from statistics import median
+from fastapi import FastAPI
+from main import root, ECHO_METHODS, FastJSONResponse
+from metrics import Metrics, MetricsMiddleware
+
+
+def make_call(asgi, method: str, body: bytes):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": "/",
+        "raw_path": b"/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/octet-stream"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+    }
+    request = {"type": "http.request", "body": body, "more_body": False}
+
+    async def receive():
+        return request
+
+    async def send(message):
+        pass
+
+    async def call():
+        await asgi(dict(scope, state={}), receive, send)
+    return call
+
+
+async def run(call, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call()
+    return time.perf_counter() - start
+
+
+def make_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_api_route("/", root, methods=ECHO_METHODS)
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware, metrics=Metrics())
+    return app
+
+
+async def bench(requests: int, rounds: int, method: str, size: int):
+    body = b"x" * size
+    bare = make_call(make_app(False), method, body)
+    wrapped = make_call(make_app(True), method, body)
+    await run(bare, requests // 10)
+    await run(wrapped, requests // 10)
+    bare_times, wrapped_times = [], []
+    for _ in range(rounds):
+        bare_times.append(await run(bare, requests))
+        wrapped_times.append(await run(wrapped, requests))
+    return median(bare_times) / requests, median(wrapped_times) / requests
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="metrics middleware overhead")
+    parser.add_argument("--requests", type=int, default=10000, help="requests per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--method", default="POST")
+    parser.add_argument("--size", type=int, default=0, help="body size in bytes")
+    args = parser.parse_args(argv)
+    bare, wrapped = asyncio.run(bench(args.requests, args.rounds, args.method.upper(), args.size))
+    overhead = wrapped - bare
+    print(f"{args.method.upper()} / body={args.size}B, median of {args.rounds} x {args.requests} requests")
+    print(f"  bare root     {bare * 1e6:8.2f} us/request")
+    print(f"  with metrics  {wrapped * 1e6:8.2f} us/request")
+    print(f"  overhead      {overhead * 1e6:8.2f} us/request ({overhead / bare * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
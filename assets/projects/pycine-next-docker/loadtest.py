@@ -0,0 +1,238 @@
+"""
+Load generator for the echo service.
+
+Starts `main.py` on a free local port (or targets `--url`), then sweeps
+concurrency levels x methods x body sizes. Each cell keeps `concurrency`
+keep-alive connections busy for `--duration` seconds over raw asyncio
+sockets, and reports RPS and p50/p95/p99 latency as a table and as JSON.
+
+    python loadtest.py --profile prod --concurrency 1,16,64 --sizes 0,1024,262144
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import platform
+import subprocess
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+
+HERE = Path(__file__).parent
+
+
+@dataclass
+class Cell:
+    method: str
+    size: int
+    concurrency: int
+    requests: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list, repr=False)
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p: float) -> float:
+        """ Nearest-rank percentile, in milliseconds """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+        return ordered[rank] * 1000
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        del data["latencies"]
+        data.update(
+            rps=round(self.rps, 1),
+            p50_ms=round(self.percentile(50), 3),
+            p95_ms=round(self.percentile(95), 3),
+            p99_ms=round(self.percentile(99), 3),
+        )
+        return data
+
+
+def build_request(host: str, method: str, size: int) -> bytes:
+    body = b"x" * size
+    head = (
+        f"{method} / HTTP/1.1\r\n"
+        f"host: {host}\r\n"
+        f"user-agent: pycine-loadtest\r\n"
+        f"content-type: application/octet-stream\r\n"
+        f"content-length: {size}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    """
+    Read one response (content-length or chunked), returns its status.
+    Interim 1xx responses (100 Continue, 103 Early Hints) have no body
+    and are skipped up to the final one.
+    """
+    while True:
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        if not 100 <= status < 200 or status == 101:
+            break
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    if "chunked" in headers.get("transfer-encoding", ""):
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get("content-length", 0)))
+    return status
+
+
+async def connection(host: str, port: int, payload: bytes, cell: Cell, deadline: float):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                writer.write(payload)
+                await writer.drain()
+                status = await read_response(reader)
+            except (OSError, asyncio.IncompleteReadError):
+                cell.errors += 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            cell.latencies.append(time.perf_counter() - start)
+            cell.requests += 1
+            if status >= 400:
+                cell.errors += 1
+    finally:
+        writer.close()
+
+
+async def run_cell(host: str, port: int, cell: Cell, duration: float, warmup: float):
+    payload = build_request(f"{host}:{port}", cell.method, cell.size)
+    if warmup > 0:
+        scratch = Cell(cell.method, cell.size, cell.concurrency)
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(
+            connection(host, port, payload, scratch, deadline) for _ in range(cell.concurrency)
+        ))
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(
+        connection(host, port, payload, cell, deadline) for _ in range(cell.concurrency)
+    ))
+    cell.elapsed = time.perf_counter() - start
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, profile: str, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, PYCINE_PROFILE=profile, PYCINE_HOST="127.0.0.1", PYCINE_PORT=str(port))
+    if workers:
+        env["PYCINE_WORKERS"] = str(workers)
+    proc = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=HERE, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("server did not start in 30s")
+
+
+def print_table(cells: list[Cell], title: str):
+    from rich.console import Console
+    from rich.table import Table
+    table = Table(title=title)
+    for name in ("method", "body", "conc", "requests", "errors", "rps", "p50 ms", "p95 ms", "p99 ms"):
+        table.add_column(name, justify="left" if name == "method" else "right")
+    for c in cells:
+        table.add_row(
+            c.method, f"{c.size}", f"{c.concurrency}", f"{c.requests}",
+            f"[red]{c.errors}[/]" if c.errors else "0",
+            f"{c.rps:.0f}", f"{c.percentile(50):.2f}", f"{c.percentile(95):.2f}", f"{c.percentile(99):.2f}",
+        )
+    Console().print(table)
+
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--url", help="host:port of a running instance (default: start one)")
+    parser.add_argument("--profile", choices=["dev", "prod"], default="prod")
+    parser.add_argument("--workers", type=int, default=0, help="server workers (prod, 0 = one per cpu)")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 16, 64])
+    parser.add_argument("--methods", default="GET,POST,PUT")
+    parser.add_argument("--sizes", type=int_list, default=[0, 1024, 256 * 1024], help="body sizes in bytes")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per cell")
+    parser.add_argument("--warmup", type=float, default=0.5, help="seconds of warmup per cell")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args(argv)
+
+    methods = [m.strip().upper() for m in args.methods.split(",") if m.strip()]
+    proc = None
+    if args.url:
+        host, _, port = args.url.removeprefix("http://").rstrip("/").rpartition(":")
+        port = int(port)
+    else:
+        host, port = "127.0.0.1", free_port()
+        proc = start_server(port, args.profile, args.workers)
+    try:
+        cells = []
+        for method in methods:
+            # GET carries no body
+            for size in [0] if method == "GET" else args.sizes:
+                for concurrency in args.concurrency:
+                    cell = Cell(method, size, concurrency)
+                    asyncio.run(run_cell(host, port, cell, args.duration, args.warmup))
+                    cells.append(cell)
+                    print(
+                        f"{method} {size}B x{concurrency}: {cell.rps:.0f} rps, "
+                        f"p99 {cell.percentile(99):.2f} ms", file=sys.stderr,
+                    )
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    target = args.url or f"main.py ({args.profile}, workers={args.workers or os.cpu_count()})"
+    print_table(cells, f"pycine-next load test: {target}")
+    if args.json:
+        args.json.write_text(json.dumps({
+            "target": target,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "duration": args.duration,
+            "cells": [c.to_dict() for c in cells],
+        }, indent=2))
+        print(f"results: {args.json}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,117 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-app = FastAPI()
+from fastapi.responses import Response, StreamingResponse
+from settings import settings
+from metrics import Metrics, MetricsMiddleware
+from recorder import Recorder, RecordMiddleware
 
-@app.api_route("/", methods=["GET", "POST", "DELETE","PUT","PATCH"])
+try:
+    import orjson
+
+    def dumps(content) -> bytes:
+        return orjson.dumps(content)
+except ImportError:
+    import json
+
+    def dumps(content) -> bytes:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """ JSON response serialized by orjson (json as fallback), no jsonable_encoder pass """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+log = logging.getLogger("uvicorn.error")
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+class EchoStreamResponse(StreamingResponse):
+    """
+    Streaming response whose body is read from the request itself.
+
+    StreamingResponse listens for the client disconnect on `receive`
+    while streaming, which would steal the request body chunks: here
+    `request.stream()` already raises on disconnect.
+
+    A body going over `max_body` ends the echo where it is: the headers
+    are already sent, so the client gets a truncated body (the limit is
+    announced in `x-echo-max-body`) and the server logs one warning.
+    """
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except BodyTooLarge as e:
+            log.warning("%s %s: %s, echo truncated", scope["method"], scope["path"], e)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # opened per serving process: the prod supervisor never starts the app
+    if not settings.record:
+        yield {}
+        return
+    recorder = Recorder(settings.record, settings.record_queue)
+    try:
+        yield {"recorder": recorder}
+    finally:
+        recorder.close()
+
+
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
+metrics = Metrics()
+if settings.metrics:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+if settings.record:
+    app.add_middleware(RecordMiddleware, max_body=settings.record_max_body)
+
+
+async def echo_stream(request: Request):
+    """ Echo the body chunk by chunk, aborting past `max_body` """
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if settings.max_body and received > settings.max_body:
+            # headers are already sent: EchoStreamResponse ends the response
+            raise BodyTooLarge(f"body over {settings.max_body} bytes")
+        yield chunk
+
+
+ECHO_METHODS = ["GET", "POST", "DELETE", "PUT", "PATCH"]
+
+
+@app.api_route("/", methods=ECHO_METHODS)
 async def root(request: Request):
+    length = request.headers.get("content-length")
+    size = int(length) if length and length.isdigit() else None
+    if settings.max_body and size is not None and size > settings.max_body:
+        return FastJSONResponse(
+            {"message": "body too large", "max_body": settings.max_body},
+            status_code=413,
+        )
+    chunked = "chunked" in request.headers.get("transfer-encoding", "")
+    if chunked or (size or 0) > settings.stream_threshold:
+        return EchoStreamResponse(
+            echo_stream(request),
+            media_type=request.headers.get("content-type", "application/octet-stream"),
+            headers={"x-echo-method": request.method, "x-echo-max-body": str(settings.max_body)},
+        )
     body = await request.body()
-    return { 
+    return FastJSONResponse({
         "message": "✅ request received",
         "method": request.method,
-        "headers": request.headers,
-        "body": body
-    }
+        "headers": dict(request.headers),
+        "body": body.decode(errors="replace"),
+    })
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("__main__:app", host="0.0.0.0", port=8000, log_level="debug", reload=True)
+    uvicorn.run(**settings.uvicorn_options())
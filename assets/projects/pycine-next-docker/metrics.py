@@ -0,0 +1,146 @@
+"""
+In-process request metrics exposed in Prometheus text format.
+
+Counters are plain ints and lists updated from the event loop thread only,
+so they need no lock. Each uvicorn worker is a process with its own
+counters: with `workers > 1` a scrape of `/metrics` sees one worker.
+"""
+import time
+from bisect import bisect_left
+
+# seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# bytes
+SIZE_BUCKETS = tuple(4 ** i for i in range(3, 13))  # 64 B .. 16 MiB
+
+CONTENT_TYPE = b"text/plain; version=0.0.4; charset=utf-8"
+# any other method is counted as OTHER, clients choose the method string
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        # last slot is +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def render(self, name: str, labels: str) -> list[str]:
+        lines = []
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {total}')
+        total += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {total}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:g}")
+        lines.append(f"{name}_count{{{labels}}} {total}")
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        self.requests: dict[tuple[str, int], int] = {}
+        self.in_flight = 0
+        self.latency: dict[str, Histogram] = {}
+        self.request_size: dict[str, Histogram] = {}
+        self.response_size: dict[str, Histogram] = {}
+
+    def observe(self, method: str, status: int, elapsed: float, received: int, sent: int):
+        if method not in METHODS:
+            method = "OTHER"
+        key = (method, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if method not in self.latency:
+            self.latency[method] = Histogram(LATENCY_BUCKETS)
+            self.request_size[method] = Histogram(SIZE_BUCKETS)
+            self.response_size[method] = Histogram(SIZE_BUCKETS)
+        self.latency[method].observe(elapsed)
+        self.request_size[method].observe(received)
+        self.response_size[method].observe(sent)
+
+    def render(self) -> bytes:
+        lines = [
+            "# HELP pycine_requests_total Requests by method and status.",
+            "# TYPE pycine_requests_total counter",
+        ]
+        for (method, status), count in sorted(self.requests.items()):
+            lines.append(f'pycine_requests_total{{method="{method}",status="{status}"}} {count}')
+        lines += [
+            "# HELP pycine_requests_in_flight Requests being handled.",
+            "# TYPE pycine_requests_in_flight gauge",
+            f"pycine_requests_in_flight {self.in_flight}",
+        ]
+        for name, text, histograms in (
+            ("pycine_request_duration_seconds", "Time to the last response byte.", self.latency),
+            ("pycine_request_size_bytes", "Request body size.", self.request_size),
+            ("pycine_response_size_bytes", "Response body size.", self.response_size),
+        ):
+            lines += [f"# HELP {name} {text}", f"# TYPE {name} histogram"]
+            for method, histogram in sorted(histograms.items()):
+                lines += histogram.render(name, f'method="{method}"')
+        return ("\n".join(lines) + "\n").encode()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware counting requests, body sizes and latency.
+
+    Bodies are measured from the ASGI messages (chunked bodies included),
+    nothing is buffered. `path` is answered by the middleware itself and
+    not counted.
+    """
+    def __init__(self, app, metrics: Metrics = None, path: str = "/metrics"):
+        self.app = app
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if scope["path"] == self.path:
+            return await self.export(send)
+
+        metrics = self.metrics
+        start = time.perf_counter()
+        received = sent = 0
+        status = 500
+
+        async def counting_receive():
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal sent, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe(scope["method"], status, time.perf_counter() - start, received, sent)
+
+    async def export(self, send):
+        body = self.metrics.render()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", CONTENT_TYPE),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import time
+import queue
+import base64
+import threading
+
+try:
+    import orjson
+
+    def dumps(record: dict) -> bytes:
+        return orjson.dumps(record)
+except ImportError:
+    def dumps(record: dict) -> bytes:
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode()
+
+# replayed with a new host and a recomputed content-length; `expect`
+# (100-continue) would make the server send an interim response first
+SKIP_HEADERS = {b"host", b"content-length", b"transfer-encoding", b"connection", b"expect"}
+
+_STOP = object()
+
+
+def encode_record(
+        ts: float, method: str, path: str, query: bytes, headers: list, chunks: list,
+        truncated: bool, content_length: int | None,
+    ) -> bytes:
+    """
+    One NDJSON line: bodies are stored as text when they are UTF-8, base64
+    otherwise. `truncated` records (body cut at `max_body`, or not read to
+    the end by the app, e.g. a 413) keep the announced `content_length`.
+    """
+    body = b"".join(chunks)
+    record = {
+        "ts": ts,
+        "method": method,
+        "path": path,
+        "query": query.decode("latin-1"),
+        "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in headers if k not in SKIP_HEADERS],
+    }
+    try:
+        record["body"] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        record["body_b64"] = base64.b64encode(body).decode("ascii")
+    if content_length is not None:
+        record["content_length"] = content_length
+    if truncated:
+        record["truncated"] = True
+    return dumps(record) + b"\n"
+
+
+class Recorder:
+    """
+    Append-only NDJSON log of requests, written by a background thread.
+
+    `record` only puts the raw request on a bounded queue: when the writer
+    falls behind the request is counted in `dropped` instead of blocking
+    the handler. Each batch is one `write` on an O_APPEND file, so several
+    workers can share the log without interleaving lines.
+    """
+    def __init__(self, path: os.PathLike, maxsize: int = 10_000, batch: int = 512):
+        self.path = os.fspath(path)
+        self.queue = queue.Queue(maxsize)
+        self.batch = batch
+        self.recorded = 0
+        self.dropped = 0
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.thread = threading.Thread(target=self._write_loop, name="recorder", daemon=True)
+        self.thread.start()
+
+    def record(self, *request):
+        try:
+            self.queue.put_nowait(request)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        while True:
+            items = [self.queue.get()]
+            while len(items) < self.batch:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            requests = [item for item in items if item is not _STOP]
+            if requests:
+                data = memoryview(b"".join(encode_record(*request) for request in requests))
+                while data:
+                    data = data[os.write(self.fd, data):]
+                self.recorded += len(requests)
+            if len(requests) < len(items):
+                return
+
+    def close(self):
+        """ Write what is queued and close the log """
+        self.queue.put(_STOP)
+        self.thread.join()
+        os.close(self.fd)
+        if self.dropped:
+            print(f"recorder: {self.dropped} requests dropped (queue full), {self.recorded} written to {self.path}", file=sys.stderr)
+
+
+def announced_body(headers: list) -> tuple[int | None, bool]:
+    """ content-length of a request, and whether it has a body at all """
+    length, chunked = None, False
+    for name, value in headers:
+        if name == b"content-length" and value.isdigit():
+            length = int(value)
+        elif name == b"transfer-encoding" and b"chunked" in value:
+            chunked = True
+    return length, chunked or bool(length)
+
+
+class RecordMiddleware:
+    """
+    Pure ASGI middleware handing every request (method, path, headers,
+    body) to the `Recorder` of the app lifespan state (`recorder` key),
+    so it is opened and closed by each serving process.
+
+    Body chunks are kept as the app reads them, up to `max_body` bytes.
+    A body cut there, or not read to its end by the app (a 413), is
+    recorded `truncated` with its announced `content_length`. The request
+    is recorded once the response is done, with the time it arrived.
+    `skip` paths (the metrics endpoint) are not recorded.
+    """
+    def __init__(self, app, max_body: int = 0, skip: tuple = ("/metrics",)):
+        self.app = app
+        self.max_body = max_body
+        self.skip = skip
+
+    async def __call__(self, scope, receive, send):
+        recorder = scope.get("state", {}).get("recorder")
+        if scope["type"] != "http" or recorder is None or scope["path"] in self.skip:
+            return await self.app(scope, receive, send)
+
+        ts = time.time()
+        chunks = []
+        kept = 0
+        truncated = False
+        content_length, has_body = announced_body(scope["headers"])
+        complete = not has_body
+
+        async def recording_receive():
+            nonlocal kept, truncated, complete
+            message = await receive()
+            if message["type"] == "http.request" and not message.get("more_body", False):
+                complete = True
+            body = message.get("body", b"")
+            if self.max_body and kept + len(body) > self.max_body:
+                body = body[:self.max_body - kept]
+                truncated = True
+            if body:
+                chunks.append(body)
+                kept += len(body)
+            return message
+
+        try:
+            await self.app(scope, recording_receive, send)
+        finally:
+            recorder.record(
+                ts, scope["method"], scope["path"], scope["query_string"], scope["headers"], chunks,
+                truncated or not complete, content_length,
+            )
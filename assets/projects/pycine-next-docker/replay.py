@@ -0,0 +1,212 @@
+"""
+Replay a request log recorded by the service (`PYCINE_RECORD`).
+
+Re-sends every recorded request (method, path, headers, body) to a target
+over keep-alive raw sockets, either at the original pacing (`--speed`
+scales it) or as fast as `--concurrency` connections allow (`--max-rate`),
+and reports RPS and p50/p95/p99 latency per method. Records whose body was
+not recorded whole (`truncated`) are skipped unless `--include-truncated`.
+
+    python replay.py requests.ndjson --url 127.0.0.1:8000 --max-rate --concurrency 64
+"""
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import asyncio
+import argparse
+import platform
+from pathlib import Path
+from dataclasses import dataclass
+
+from loadtest import Cell, free_port, print_table, read_response, start_server
+from recorder import SKIP_HEADERS
+
+
+@dataclass
+class Entry:
+    offset: float
+    method: str
+    payload: bytes
+    size: int
+
+
+def build_request(record: dict, host: str) -> tuple[bytes, int]:
+    """ Raw HTTP/1.1 request of a record, with the target host and the body length """
+    if "body_b64" in record:
+        body = base64.b64decode(record["body_b64"])
+    else:
+        body = record.get("body", "").encode("utf-8")
+    target = record["path"] + (f"?{record['query']}" if record.get("query") else "")
+    lines = [f"{record['method']} {target} HTTP/1.1", f"host: {host}"]
+    # logs written before a header joined SKIP_HEADERS may still carry it
+    lines += [
+        f"{name}: {value}" for name, value in record.get("headers", [])
+        if name.lower().encode("latin-1") not in SKIP_HEADERS
+    ]
+    lines.append(f"content-length: {len(body)}")
+    head = "\r\n".join(lines) + "\r\n\r\n"
+    return head.encode("latin-1") + body, len(body)
+
+
+def load_log(path: Path, host: str, include_truncated: bool = False) -> tuple[list[Entry], int]:
+    """
+    Entries in arrival order, offsets in seconds from the first request,
+    and the number of truncated records skipped (their body differs from
+    the one the client sent)
+    """
+    records = []
+    skipped = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("truncated") and not include_truncated:
+                skipped += 1
+                continue
+            records.append(record)
+    records.sort(key=lambda r: r["ts"])
+    if not records:
+        return [], skipped
+    start = records[0]["ts"]
+    entries = []
+    for record in records:
+        payload, size = build_request(record, host)
+        entries.append(Entry(record["ts"] - start, record["method"], payload, size))
+    return entries, skipped
+
+
+@dataclass
+class Pacing:
+    """ How late requests were sent compared to the recorded schedule """
+    late: int = 0
+    max_lag: float = 0.0
+
+    def observe(self, lag: float):
+        if lag > 0.001:
+            self.late += 1
+            self.max_lag = max(self.max_lag, lag)
+
+
+async def connection(host: str, port: int, entries, cells: dict, pacing: Pacing, start: float, speed: float):
+    """ Send the next entry on one keep-alive connection until the log is done """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        for entry in entries:
+            if speed:
+                due = start + entry.offset / speed
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                else:
+                    pacing.observe(-wait)
+            cell = cells[entry.method]
+            sent = time.perf_counter()
+            try:
+                writer.write(entry.payload)
+                await writer.drain()
+                status = await read_response(reader)
+            except (OSError, asyncio.IncompleteReadError):
+                cell.errors += 1
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            cell.latencies.append(time.perf_counter() - sent)
+            cell.requests += 1
+            if status >= 400:
+                cell.errors += 1
+    finally:
+        writer.close()
+
+
+async def replay(host: str, port: int, entries: list[Entry], concurrency: int, speed: float) -> tuple[list[Cell], Pacing]:
+    """
+    Replay `entries` on `concurrency` connections sharing one iterator, so
+    each request goes out on the first free connection. With `speed` a
+    request waits for its recorded offset (divided by `speed`); a request
+    that finds every connection busy is sent late and counted in `Pacing`.
+    """
+    cells = {}
+    for entry in entries:
+        cell = cells.setdefault(entry.method, Cell(entry.method, 0, concurrency))
+        cell.size += entry.size
+    pacing = Pacing()
+    shared = iter(entries)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        connection(host, port, shared, cells, pacing, start, speed) for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    for cell in cells.values():
+        cell.elapsed = elapsed
+        # the body column shows the mean body size of the method
+        cell.size = cell.size // max(1, cell.requests + cell.errors)
+    return list(cells.values()), pacing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("log", type=Path, help="NDJSON request log (PYCINE_RECORD)")
+    parser.add_argument("--url", help="host:port of the target (default: start main.py)")
+    parser.add_argument("--profile", choices=["dev", "prod"], default="prod")
+    parser.add_argument("--workers", type=int, default=0, help="server workers (prod, 0 = one per cpu)")
+    parser.add_argument("--concurrency", type=int, default=16, help="keep-alive connections")
+    parser.add_argument("--max-rate", action="store_true", help="ignore the recorded pacing")
+    parser.add_argument("--speed", type=float, default=1.0, help="pacing multiplier (2 = twice as fast)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the log this many times")
+    parser.add_argument("--include-truncated", action="store_true", help="also send records with a partial body")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        host, _, port = args.url.removeprefix("http://").rstrip("/").rpartition(":")
+        port = int(port)
+    else:
+        host, port = "127.0.0.1", free_port()
+    entries, truncated = load_log(args.log, f"{host}:{port}", args.include_truncated)
+    if truncated:
+        print(f"{truncated} truncated records skipped (--include-truncated sends them)", file=sys.stderr)
+    if not entries:
+        parser.error(f"no requests to replay in {args.log}")
+    proc = None if args.url else start_server(port, args.profile, args.workers)
+    if args.repeat > 1:
+        # later rounds follow the previous one on the recorded schedule
+        span = entries[-1].offset + 0.001
+        entries = [
+            Entry(e.offset + span * round_, e.method, e.payload, e.size)
+            for round_ in range(args.repeat) for e in entries
+        ]
+    speed = 0.0 if args.max_rate else args.speed
+    try:
+        cells, pacing = asyncio.run(replay(host, port, entries, args.concurrency, speed))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    mode = "max rate" if args.max_rate else f"{args.speed:g}x pacing"
+    target = args.url or f"main.py ({args.profile}, workers={args.workers or os.cpu_count()})"
+    print_table(cells, f"pycine-next replay of {args.log.name} ({len(entries)} requests, {mode}): {target}")
+    if speed:
+        print(f"{pacing.late} requests sent late, max lag {pacing.max_lag * 1000:.1f} ms", file=sys.stderr)
+    if args.json:
+        args.json.write_text(json.dumps({
+            "target": target,
+            "log": str(args.log),
+            "mode": mode,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "late": pacing.late,
+            "truncated_skipped": truncated,
+            "max_lag_ms": round(pacing.max_lag * 1000, 3),
+            "cells": [c.to_dict() for c in cells],
+        }, indent=2))
+        print(f"results: {args.json}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+import importlib.util
+from pathlib import Path
+from typing import Literal
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+KB = 1024
+MB = 1024 * KB
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class Settings(BaseSettings):
+    """
+    Service settings, read from `PYCINE_*` env variables or a `.env` file.
+
+    `profile=dev` keeps the single reloading worker with debug logs;
+    `profile=prod` runs `workers` processes (one per cpu by default) on
+    uvloop/httptools without access logs.
+    """
+    model_config = SettingsConfigDict(env_prefix="PYCINE_", env_file=".env", extra="ignore")
+
+    profile: Literal["dev", "prod"] = "dev"
+    host: str = "0.0.0.0"
+    port: int = 8000
+    # prod only, 0 = one worker per cpu
+    workers: int = 0
+    # requests with a larger body get 413 (0 = no limit)
+    max_body: int = 10 * MB
+    # bodies larger than this (or chunked) are streamed back instead of buffered
+    stream_threshold: int = 64 * KB
+    # expose request metrics at /metrics (Prometheus text format)
+    metrics: bool = True
+    # append every request to this NDJSON file (replay.py re-sends it)
+    record: Path | None = None
+    # requests waiting for the writer, more are dropped rather than delaying responses
+    record_queue: int = 10_000
+    # larger bodies are recorded truncated (0 = no limit)
+    record_max_body: int = 1 * MB
+
+    def uvicorn_options(self) -> dict:
+        if self.profile == "dev":
+            return dict(
+                app="__main__:app",
+                host=self.host,
+                port=self.port,
+                log_level="debug",
+                reload=True,
+            )
+        return dict(
+            # workers are spawned processes: the app must be importable by name
+            app="main:app",
+            host=self.host,
+            port=self.port,
+            workers=self.workers or os.cpu_count() or 1,
+            loop="uvloop" if _installed("uvloop") else "auto",
+            http="httptools" if _installed("httptools") else "auto",
+            log_level="warning",
+            access_log=False,
+        )
+
+
+settings = Settings()
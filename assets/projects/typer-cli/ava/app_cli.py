@@ -1,28 +1,33 @@
 #!/usr/bin/env python
+import os
+import itertools
 from pathlib import Path
 import importlib.metadata
 from typing_extensions import Annotated
 import typer
 from typer import Context
-from rich import print
-import zipfile
 from ava import (
-    settings,
-    console,
     CustomTyperGroup, 
     debug_func,
 )
-from ava.utils import search_files
+from ava.cli import COMMAND_GROUPS
+from ava.utils import search_files, iter_files
+from ava.extract import extract_archives, ExtractResult, MB, STAGING_PREFIX
+from ava.extractors import ARCHIVE_PATTERNS, ExtractLimits, is_archive_name
+from ava.profiling import span
+from ava.output import OutputFormat, write_paths
+from ava.dedup import ContentStore, LinkMode, STORE_DIRNAME
+from ava.manifest import ExtractManifest, MANIFEST_FILENAME
+from ava.log import file_event
 
 CLI_NAME = "ava"
-__version__ = importlib.metadata.version(CLI_NAME)
 
 DEBUG = False
 
 
 # ============================================================
 app = typer.Typer(
-        cls=CustomTyperGroup,
+        cls=CustomTyperGroup.with_lazy_groups(COMMAND_GROUPS),
         no_args_is_help=True,
         rich_markup_mode="rich"
     )
@@ -31,7 +36,7 @@ app = typer.Typer(
 @app.command("version")
 def version():
     """ CLI version """
-    print(f"{__version__}")
+    print(f"{importlib.metadata.version(CLI_NAME)}")
 
 
 # ============================================================
@@ -43,39 +48,298 @@ def unzip_all(
             help="Files folder path (cwd default)"
         ),
         dry_run: Annotated[bool, typer.Option("--dry")] = None,
-        ext: list[str] = ['*.zip','*.rar'],
+        ext: list[str] = ARCHIVE_PATTERNS,
+        fmt: Annotated[OutputFormat, typer.Option("--format", help="--dry output format")] = OutputFormat.rich,
+        jobs: Annotated[int, typer.Option("--jobs", "-j", help="Archives extracted in parallel")] = 1,
+        workers: Annotated[int, typer.Option("--workers", "-w", help="Threads walking the folder tree")] = 0,
+        use_index: Annotated[bool, typer.Option("--index", help="Find archives through the file index (ava index)")] = None,
+        max_inflight: Annotated[int, typer.Option("--max-inflight", help="Max MB of archives in flight (0 = no limit)")] = 0,
+        force: Annotated[bool, typer.Option("--force", help="Re-extract archives already in the manifest")] = None,
+        prune: Annotated[bool, typer.Option("--prune", help="Remove outputs of archives that no longer exist")] = None,
+        checksum: Annotated[bool, typer.Option("--checksum", help="Also compare archive CRC32 to detect changes")] = None,
+        dedup: Annotated[bool, typer.Option("--dedup", help="Store identical files once (resources.data/store) and link copies")] = None,
+        link: Annotated[LinkMode, typer.Option("--link", help="How --dedup materializes copies")] = LinkMode.hardlink,
+        store_dir: Annotated[Path, typer.Option("--store", help="--dedup store folder, on the same filesystem as FOLDER")] = None,
+        no_guard: Annotated[bool, typer.Option("--no-guard", help="Disable the [unzip] extraction limits")] = None,
+        manifest_path: Annotated[Path, typer.Option("--manifest", help="Manifest file (default: user config dir)")] = None,
+        watch: Annotated[bool, typer.Option("--watch", help="Keep running and extract archives as they land (Ctrl-C stops)")] = None,
+        settle: Annotated[float, typer.Option("--settle", help="--watch: seconds an upload must stay unchanged")] = 2.0,
+        polling: Annotated[bool, typer.Option("--polling", help="--watch: re-list the tree instead of using inotify")] = None,
+        poll_interval: Annotated[float, typer.Option("--poll-interval", help="--watch --polling: seconds between listings")] = 5.0,
         verbose: Annotated[bool, typer.Option("--verbose", "-v")] = None,
     ):
     """
-    Unzip all files recursivelly
+    Unzip all files recursivelly (zip, tar.*, and rar/7z when 7z or unrar is installed)
 
     ava unzip-all
     ava unzip-all folder
+    ava unzip-all folder --jobs 8
+    ava unzip-all folder --prune
+    ava unzip-all folder --watch --jobs 4
     """
-    
+    if watch and dry_run:
+        raise typer.BadParameter("--watch extracts archives as they land, it cannot be combined with --dry", param_hint="--watch")
+    from rich import print
+    from ava import context, console, settings
+    manifest = ExtractManifest(
+        manifest_path or context.USER_CONFIG_PATH / MANIFEST_FILENAME,
+        checksum=checksum,
+    )
+    skipped = 0
+    # files extracted by this run: nested archives are left for the next
+    # run, whether the walk or the watch (moved in: IN_MOVED_TO) sees them
+    produced = set()
+
+    def claim(output: Path):
+        if is_archive_name(output.name):
+            produced.add(os.path.normpath(output))
+
+    def pending(archives):
+        """ drop archives the manifest says are already extracted """
+        nonlocal skipped
+        for archive in archives:
+            if archive is None:
+                # idle tick of --watch
+                yield archive
+                continue
+            # the walk may run into a folder being extracted right now
+            if any(part.startswith(STAGING_PREFIX) for part in archive.parts):
+                continue
+            if os.path.normpath(archive) in produced:
+                continue
+            if not force and manifest.is_current(archive):
+                skipped += 1
+                file_event("skipped", archive)
+                continue
+            yield archive
+
+    if prune:
+        for entry in manifest.missing(folder):
+            if dry_run:
+                print(f"Would prune: {entry['archive']}")
+                continue
+            removed = manifest.prune(entry)
+            print(f"Pruned {removed} files of: {entry['archive']}")
+        store_root = store_dir or settings.resources.data.path / STORE_DIRNAME
+        if dedup and store_root.exists():
+            # objects only the pruned outputs linked to
+            objects, freed = ContentStore(store_root, link=link).gc(dry_run=bool(dry_run))
+            if objects:
+                verb = "Would remove" if dry_run else "Removed"
+                print(f"{verb} {objects} unreferenced store objects ({freed / MB:.1f} MB) from {store_root}")
+
+    if not dry_run:
+        def report(result: ExtractResult):
+            if not result.ok:
+                file_event("failed", result.archive, level="ERROR", error=result.error)
+                print(f"[red b]Failed[/] {result.archive}: {result.error}")
+                return
+            try:
+                manifest.record(result.archive, result.dest, result.outputs)
+            except OSError as e:
+                # removed or replaced since it was extracted (--watch, a
+                # concurrent cleanup): it is extracted again by the next run
+                file_event("failed", result.archive, level="WARNING", error=f"manifest not updated: {e}")
+                print(f"[yellow b]Not recorded[/] {result.archive}: {e}")
+            file_event(
+                "extracted", result.archive, level="INFO",
+                dest=str(result.dest), files=result.files, bytes=result.bytes, seconds=round(result.elapsed, 6),
+            )
+            print(
+                f"Extracted {result.archive.name} to: {result.dest} "
+                f"[dim]({result.files} files, {result.bytes / MB:.1f} MB, "
+                f"{result.files_per_sec:.1f} files/s, {result.mb_per_sec:.1f} MB/s)"
+            )
+
+        unzip = settings.unzip
+        limits = None
+        if unzip and unzip.guarded and not no_guard:
+            limits = ExtractLimits(
+                max_total_bytes=(unzip.max_total_mb or 0) * MB,
+                max_member_bytes=(unzip.max_member_mb or 0) * MB,
+                max_members=unzip.max_members or 0,
+                max_ratio=unzip.max_ratio or 0,
+                reject_nested=bool(unzip.reject_nested),
+            )
+
+        store = None
+        if dedup:
+            store = ContentStore(store_dir or settings.resources.data.path / STORE_DIRNAME, link=link)
+            if not store.same_filesystem(folder):
+                print(
+                    f"[yellow b]--dedup skipped[/]: {store.root} is not on the filesystem of {folder}, "
+                    "links would fall back to copies (use --store)"
+                )
+                store = None
+
+        watcher = None
+        if watch:
+            from ava.watch import ArchiveWatcher
+            from ava.utils import compile_patterns
+            # watches are in place before the walk: nothing lands unseen in between
+            watcher = ArchiveWatcher(
+                folder,
+                compile_patterns(ext).match,
+                settle=settle,
+                poll_interval=poll_interval,
+                polling=bool(polling),
+                ignore_prefix=STAGING_PREFIX,
+            )
+            print(f"Watching {folder} ({watcher.backend}), Ctrl-C to stop")
+
+        # extraction starts while the walk is still running
+        if use_index:
+            archives = search_files(folder, extensions=ext, use_index=True, stream=True, sort_files=False)
+        else:
+            archives = iter_files(folder, extensions=ext, workers=workers)
+        if watcher is not None:
+            archives = itertools.chain(archives, watcher)
+        try:
+            stats = extract_archives(
+                pending(archives),
+                jobs=jobs,
+                max_inflight=max_inflight * MB,
+                on_result=report,
+                limits=limits,
+                store=store,
+                claim=claim,
+            )
+        except KeyboardInterrupt:
+            # running extractions finished with the pool, results are recorded
+            manifest.compact()
+            print("Stopped watching")
+            return
+        finally:
+            watcher and watcher.close()
+        manifest.compact()
+        with span("output"):
+            if skipped:
+                print(f"Skipped {skipped} unchanged archives")
+            console.print(stats.table())
+            if store is not None:
+                saved = store.stats
+                print(
+                    f"dedup: {saved.duplicates}/{saved.files} duplicate files, "
+                    f"[green b]{saved.bytes_saved / MB:.1f} MB saved[/] ({saved.copies} copied) in {store.root}"
+                )
+        if stats.failed:
+            raise typer.Exit(1)
+    else:
+        files = search_files(
+            folderpath=folder,
+            extensions=ext,
+            workers=workers,
+            use_index=use_index,
+            stream=fmt != OutputFormat.rich,
+            # max_files=500,
+            # verbose=verbose,
+        )
+        with span("output"):
+            write_paths(files, fmt)
+
+
+# ============================================================
+@app.command("search")
+def search(
+        folder: Path = typer.Argument(Path("."), help="Folder to search (cwd default)"),
+        ext: Annotated[list[str], typer.Option("--ext", "-e", help="Glob patterns of file names")] = ['*'],
+        ignore: Annotated[list[str], typer.Option("--ignore", "-i", help="Skip paths with this part (e.g. node_modules)")] = [],
+        keyword: Annotated[list[str], typer.Option("--keyword", "-k", help="File contains any of these")] = [],
+        regex: Annotated[str, typer.Option("--regex", help="File content matches this regex")] = None,
+        max_files: Annotated[int, typer.Option("--max-files", "-n")] = 0,
+        max_size: Annotated[int, typer.Option("--max-size", help="Skip larger files (bytes) in content search")] = 0,
+        workers: Annotated[int, typer.Option("--workers", "-w")] = 0,
+        use_index: Annotated[bool, typer.Option("--index", help="Answer from the file index (ava index)")] = None,
+        fmt: Annotated[OutputFormat, typer.Option("--format")] = OutputFormat.rich,
+    ):
+    """
+    Search files by name and content
+
+    ava search src -e "*.py" -i .git -k TODO
+    ava search . -e "*.zip" --format null0 | xargs -0 ls -l
+    """
+    if "" in keyword:
+        raise typer.BadParameter("keywords cannot be empty", param_hint="--keyword")
     files = search_files(
         folderpath=folder,
         extensions=ext,
-        # max_files=500,
-        # verbose=verbose,
+        ignore_parts=ignore,
+        keywords=keyword,
+        regex=regex,
+        max_files=max_files,
+        max_size=max_size,
+        workers=workers,
+        use_index=use_index,
+        stream=fmt != OutputFormat.rich,
     )
-    if not dry_run:
-        for file in files:
-            # Extract the ZIP file
-            with zipfile.ZipFile(file, 'r') as zip_ref:
-                zip_ref.extractall(file.parent)  # Extracts to the ZIP file's directory
-                print(f"Extracted to: {file.parent}")
-    else:
-        # print(results.data_table())
-        # print(f"total={len(results.files)}")
-        print(files)
-        print(len(files))
+    with span("output"):
+        write_paths(files, fmt)
+
+
+# ============================================================
+@app.command("batch")
+def batch(
+        source: Annotated[Path, typer.Argument(help="File with one command per line or NDJSON, '-' for stdin")] = Path("-"),
+        jobs: Annotated[int, typer.Option("--jobs", "-j", help="Run independent entries concurrently")] = 1,
+        fail_fast: Annotated[bool, typer.Option("--fail-fast", help="Stop after the first failing entry")] = None,
+        fmt: Annotated[OutputFormat, typer.Option("--format", help="rich or ndjson (one result per entry)")] = OutputFormat.rich,
+    ):
+    """
+    Run many ava commands in one process
+
+    Entries share the loaded settings and modules, so each one skips the
+    interpreter startup and settings load.
+
+    Usage:
+        ava batch commands.txt
+
+        printf 'debug settings --key app\\nsearch data -e "*.zip"\\n' | ava batch -
+
+        ava batch commands.ndjson --jobs 4 --format ndjson
+    """
+    import sys
+    import json
+    from ava.batch import parse_entries, run_batch
+    from ava import console
+    if fmt not in (OutputFormat.rich, OutputFormat.ndjson):
+        raise typer.BadParameter("batch supports --format rich or ndjson", param_hint="--format")
+    lines = sys.stdin if str(source) == "-" else source.open(encoding="utf-8")
+    command = typer.main.get_command(app)
+    results = []
+    try:
+        for result in run_batch(command, parse_entries(lines, CLI_NAME), jobs=jobs, fail_fast=bool(fail_fast), prog_name=CLI_NAME):
+            results.append(result)
+            if fmt == OutputFormat.ndjson:
+                sys.stdout.write(json.dumps(result.to_dict()) + "\n")
+                sys.stdout.flush()
+                continue
+            sys.stdout.write(result.output)
+            if result.error:
+                console.print(f"[red]{result.error}")
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="source")
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+    failed = [r for r in results if not r.ok]
+    if fmt == OutputFormat.rich:
+        from rich.table import Table
+        table = Table(title=f"batch: {len(results)} entries, {len(failed)} failed")
+        table.add_column("line", justify="right")
+        table.add_column("command", style="cyan")
+        table.add_column("exit", justify="right")
+        table.add_column("seconds", justify="right")
+        for r in results:
+            table.add_row(f"{r.line}", " ".join(r.args), f"{r.exit_code}", f"{r.seconds:.3f}", style=None if r.ok else "red")
+        console.print(table)
+    if failed:
+        raise typer.Exit(1)
 
 
 # ============================================================
 def main():
-    import ava.cli as cli
-    app.add_typer(cli.debug.app, name="debug")
+    from ava import log
+    log.REPLACE_DEFAULT_HANDLER = True
     app()
 
 
@@ -0,0 +1,184 @@
+import io
+import sys
+import json
+import time
+import shlex
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
+import click
+
+
+@dataclass
+class BatchEntry:
+    line: int
+    args: list[str]
+
+
+@dataclass
+class BatchResult:
+    line: int
+    args: list[str]
+    exit_code: int = 0
+    seconds: float = 0.0
+    output: str = ""
+    error: str | None = field(default=None)
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0
+
+    def to_dict(self) -> dict:
+        return {
+            "line": self.line,
+            "args": self.args,
+            "exit_code": self.exit_code,
+            "seconds": round(self.seconds, 6),
+            "output": self.output,
+            "error": self.error,
+        }
+
+
+def parse_entries(lines: Iterable[str], prog_name: str = "ava") -> Iterator[BatchEntry]:
+    """
+    One command per line, either shell-quoted (`unzip-all data --dry`) or
+    NDJSON: a list of args, or an object with `args` (list) or `cmd`
+    (string). Blank lines and `#` comments are skipped, a leading
+    `prog_name` is dropped.
+    """
+    for number, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            if line[0] in "[{":
+                data = json.loads(line)
+                if isinstance(data, dict):
+                    data = data.get("args", data.get("cmd"))
+                args = shlex.split(data) if isinstance(data, str) else data
+                if not isinstance(args, list):
+                    raise ValueError("expected a list of args, or an object with args/cmd")
+                args = [str(a) for a in args]
+            else:
+                args = shlex.split(line)
+        except ValueError as e:
+            raise ValueError(f"line {number}: {e}") from None
+        if args and args[0] == prog_name:
+            args = args[1:]
+        if args:
+            yield BatchEntry(number, args)
+
+
+class ThreadStdout(io.TextIOBase):
+    """ sys.stdout replacement writing to a per-thread capture stream when one is set """
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local()
+
+    @property
+    def target(self):
+        return getattr(self.local, "stream", None) or self.default
+
+    @property
+    def buffer(self):
+        return self.target.buffer
+
+    @property
+    def encoding(self):
+        return self.target.encoding
+
+    def write(self, s: str) -> int:
+        return self.target.write(s)
+
+    def flush(self):
+        self.target.flush()
+
+    def isatty(self) -> bool:
+        return self.target.isatty()
+
+    def fileno(self) -> int:
+        return self.target.fileno()
+
+
+@contextmanager
+def captured_stdout() -> Iterator[ThreadStdout]:
+    """
+    Install the per-thread stdout. Entries get an empty stdin: the batch
+    may be read from the real one, which the builtin `exit()` would close.
+    """
+    proxy = ThreadStdout(sys.stdout)
+    stdin = sys.stdin
+    sys.stdout, sys.stdin = proxy, io.StringIO()
+    try:
+        yield proxy
+    finally:
+        sys.stdout, sys.stdin = proxy.default, stdin
+
+
+def run_entry(command: click.Command, entry: BatchEntry, proxy: ThreadStdout, prog_name: str = "ava") -> BatchResult:
+    """ Invoke one entry through the click command, capturing its stdout """
+    result = BatchResult(entry.line, entry.args)
+    if entry.args[0] == "batch":
+        result.exit_code = 2
+        result.error = "nested batch is not supported"
+        return result
+    raw = io.BytesIO()
+    stream = io.TextIOWrapper(raw, encoding="utf-8", write_through=True)
+    proxy.local.stream = stream
+    start = time.perf_counter()
+    try:
+        # standalone mode: click reports usage errors and always ends with SystemExit
+        command.main(args=list(entry.args), prog_name=prog_name, standalone_mode=True)
+    except SystemExit as e:
+        code = e.code
+        result.exit_code = code if isinstance(code, int) else (0 if code is None else 1)
+    except Exception as e:
+        result.exit_code = 1
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        result.seconds = time.perf_counter() - start
+        stream.flush()
+        proxy.local.stream = None
+    result.output = raw.getvalue().decode("utf-8", errors="replace")
+    return result
+
+
+def run_batch(
+        command: click.Command,
+        entries: Iterable[BatchEntry],
+        jobs: int = 1,
+        fail_fast: bool = False,
+        prog_name: str = "ava",
+    ) -> Iterator[BatchResult]:
+    """
+    Run entries in one process and yield their results in input order.
+
+    Settings, context and imported modules are shared by every entry. With
+    `jobs > 1` entries run on a thread pool (only for independent
+    entries), keeping a bounded window in flight so `entries` can be a
+    stream. `fail_fast` stops starting entries after the first failure.
+    """
+    with captured_stdout() as proxy:
+        if jobs <= 1:
+            for entry in entries:
+                result = run_entry(command, entry, proxy, prog_name)
+                yield result
+                if fail_fast and not result.ok:
+                    return
+            return
+        window = deque()
+        failed = False
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for entry in entries:
+                window.append(pool.submit(run_entry, command, entry, proxy, prog_name))
+                if len(window) >= jobs * 2:
+                    result = window.popleft().result()
+                    failed = failed or not result.ok
+                    yield result
+                if fail_fast and failed:
+                    break
+            while window:
+                yield window.popleft().result()
@@ -0,0 +1,154 @@
+import os
+import re
+import time
+import sqlite3
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+CATALOG_FILENAME = "catalog.db"
+
+# Foz-TADS-DesWeb4-2024-3-Artista-397225.zip: course ends with the year,
+# the submission id is the last field, the assignment name is in between
+ASSIGN_NAME = re.compile(r"^(?P<course>.+?-\d{4})-(?P<name>.+)-(?P<id>\d+)$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (name TEXT PRIMARY KEY, created_at REAL);
+CREATE TABLE IF NOT EXISTS assigns (
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    course TEXT NOT NULL REFERENCES courses(name),
+    path TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    added_at REAL,
+    PRIMARY KEY (course, name, id)
+);
+CREATE INDEX IF NOT EXISTS assigns_id ON assigns(id);
+CREATE INDEX IF NOT EXISTS assigns_path ON assigns(path);
+"""
+
+UPSERT = """
+INSERT INTO assigns VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (course, name, id) DO UPDATE SET
+    path=COALESCE(excluded.path, path),
+    size=COALESCE(excluded.size, size),
+    mtime_ns=COALESCE(excluded.mtime_ns, mtime_ns)
+"""
+
+
+def parse_assign_name(filename: str) -> dict | None:
+    """ course, name and id fields of a submission archive name """
+    stem = Path(filename).name
+    for suffix in (".tar.gz", ".tar.bz2", ".tar.xz", ".tar.zst"):
+        if stem.endswith(suffix):
+            stem = stem[:-len(suffix)]
+            break
+    else:
+        stem = os.path.splitext(stem)[0]
+    m = ASSIGN_NAME.match(stem)
+    return m.groupdict() if m else None
+
+
+def catalog_path() -> Path:
+    from ava import settings
+    return settings.resources.assigns.path / CATALOG_FILENAME
+
+
+@dataclass
+class IngestStats:
+    scanned: int = 0
+    added: int = 0
+    unparsed: int = 0
+    courses: int = 0
+    elapsed: float = 0.0
+
+
+class Catalog:
+    """
+    SQLite catalog of submissions (course, assignment name, id, archive
+    path), indexed by course/assignment and by id so lookups do not walk
+    the folder tree.
+    """
+    def __init__(self, db_path: Path = None):
+        self.db_path = Path(db_path or catalog_path())
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_course(self, name: str) -> bool:
+        """ Returns False when the course already exists """
+        with self.db:
+            cur = self.db.execute("INSERT OR IGNORE INTO courses VALUES (?, ?)", (name, time.time()))
+        return cur.rowcount > 0
+
+    def add_assign(self, id: str, name: str, course: str, path: Path = None):
+        size = mtime_ns = None
+        if path is not None:
+            st = os.stat(path)
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+            path = os.path.abspath(path)
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO courses VALUES (?, ?)", (course, time.time()))
+            self.db.execute(UPSERT, (id, name, course, path, size, mtime_ns, time.time()))
+
+    def ingest(self, paths: Iterable[Path]) -> IngestStats:
+        """
+        Parse every archive name of `paths` (one walk) and insert all the
+        submissions in a single transaction
+        """
+        stats = IngestStats()
+        start = time.perf_counter()
+        now = time.time()
+        rows, courses = [], set()
+        for path in paths:
+            stats.scanned += 1
+            fields = parse_assign_name(os.path.basename(path))
+            if fields is None:
+                stats.unparsed += 1
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            courses.add(fields["course"])
+            rows.append((
+                fields["id"], fields["name"], fields["course"],
+                os.path.abspath(path), st.st_size, st.st_mtime_ns, now,
+            ))
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO courses VALUES (?, ?)", ((c, now) for c in courses))
+            self.db.executemany(UPSERT, rows)
+        stats.added = len(rows)
+        stats.courses = len(courses)
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    def find(self, course: str = None, name: str = None, id: str = None) -> Iterator[sqlite3.Row]:
+        """ Submissions matching every given field (exact match, indexed) """
+        where, params = [], []
+        for column, value in (("course", course), ("name", name), ("id", id)):
+            if value is not None:
+                where.append(f"{column}=?")
+                params.append(value)
+        sql = "SELECT id, name, course, path, size FROM assigns"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        yield from self.db.execute(sql + " ORDER BY course, name, id", params)
+
+    def courses(self) -> list[sqlite3.Row]:
+        return self.db.execute(
+            "SELECT c.name, COUNT(a.id) AS submissions, COUNT(DISTINCT a.name) AS assigns "
+            "FROM courses c LEFT JOIN assigns a ON a.course = c.name "
+            "GROUP BY c.name ORDER BY c.name"
+        ).fetchall()
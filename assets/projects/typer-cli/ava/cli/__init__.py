@@ -1,3 +1,8 @@
-from ava.cli import (
-    debug
-)
\ No newline at end of file
+# Command groups of the `ava` app, imported only when invoked
+COMMAND_GROUPS = {
+    "assign": "ava.cli.assign:app",
+    "course": "ava.cli.course:app",
+    "debug": "ava.cli.debug:app",
+    "index": "ava.cli.index:app",
+    "zip": "ava.cli.zip:app",
+}
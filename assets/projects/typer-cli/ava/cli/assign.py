@@ -0,0 +1,105 @@
+import typer
+from pathlib import Path
+from rich.table import Table
+from ava import console, CustomTyperGroup
+from ava.catalog import Catalog, parse_assign_name
+from ava.extractors import ARCHIVE_PATTERNS
+from ava.output import OutputFormat
+from typing_extensions import Annotated
+
+
+app = typer.Typer(
+    cls=CustomTyperGroup,
+    no_args_is_help=True,
+    short_help="Submissions catalog",
+    rich_markup_mode="rich",
+)
+
+
+@app.command("add")
+def add(
+        filename: Annotated[str, typer.Argument(help="Archive name to parse: <course>-<year>-<name>-<id>.zip")] = None,
+        id: Annotated[str, typer.Option("--id")] = None,
+        name: Annotated[str, typer.Option("--name")] = None,
+        course: Annotated[str, typer.Option("--course")] = None,
+    ):
+    """
+    Add one submission
+
+    ava assign add "Foz-TADS-DesWeb4-2024-3-Artista-397225.zip"
+
+    ava assign add --id="397225" --name="3-Artista" --course="Foz-TADS-DesWeb4-2024"
+    """
+    fields = {"id": id, "name": name, "course": course}
+    path = None
+    if filename:
+        parsed = parse_assign_name(filename)
+        if parsed is None:
+            console.print(f"[red b]Cannot parse[/] {filename}: expected <course>-<year>-<name>-<id>")
+            raise typer.Exit(1)
+        fields = {key: fields[key] or value for key, value in parsed.items()}
+        path = Path(filename) if Path(filename).is_file() else None
+    missing = [key for key, value in fields.items() if not value]
+    if missing:
+        console.print(f"[red b]Missing[/] {', '.join('--' + key for key in missing)}")
+        raise typer.Exit(1)
+    with Catalog() as catalog:
+        catalog.add_assign(path=path, **fields)
+    console.print(f"[green b]{fields['course']}[/] {fields['name']} {fields['id']}")
+
+
+@app.command("ingest")
+def ingest(
+        folder: Path = typer.Argument(Path("."), help="Folder with the submission archives"),
+        ext: Annotated[list[str], typer.Option("--ext", "-e")] = ARCHIVE_PATTERNS,
+        workers: Annotated[int, typer.Option("--workers", help="Threads listing folders")] = 0,
+    ):
+    """
+    Add every submission archive found under a folder, in one transaction
+
+    ava assign ingest data/submissions
+    """
+    from ava.utils import iter_files
+    with Catalog() as catalog:
+        stats = catalog.ingest(iter_files(folder, extensions=ext, workers=workers))
+    console.print(
+        f"[green b]{stats.added}[/] submissions from {stats.courses} courses "
+        f"({stats.scanned} archives, {stats.unparsed} names not parsed) in {stats.elapsed:.2f}s"
+    )
+
+
+@app.command("ls")
+def ls(
+        course: Annotated[str, typer.Option("--course", "-c")] = None,
+        name: Annotated[str, typer.Option("--name", "-n")] = None,
+        id: Annotated[str, typer.Option("--id")] = None,
+        fmt: Annotated[OutputFormat, typer.Option("--format")] = OutputFormat.rich,
+    ):
+    """
+    List submissions from the catalog
+
+    ava assign ls --course Foz-TADS-DesWeb4-2024
+
+    ava assign ls --id 397225 --format ndjson
+    """
+    import sys
+    import json
+    from ava.output import write_paths
+    with Catalog() as catalog:
+        rows = catalog.find(course=course, name=name, id=id)
+        if fmt == OutputFormat.ndjson:
+            for row in rows:
+                sys.stdout.write(json.dumps(dict(row)) + "\n")
+            return
+        if fmt != OutputFormat.rich:
+            write_paths((Path(row["path"]) for row in rows if row["path"]), fmt)
+            return
+        table = Table(title="Submissions")
+        for column in ("course", "name", "id", "path"):
+            table.add_column(column, style="bold cyan" if column == "course" else None)
+        count = 0
+        for row in rows:
+            table.add_row(row["course"], row["name"], row["id"], row["path"] or "")
+            count += 1
+    console.print(table)
+    console.print(count)
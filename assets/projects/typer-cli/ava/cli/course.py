@@ -0,0 +1,44 @@
+import typer
+from rich.table import Table
+from ava import console, CustomTyperGroup
+from ava.catalog import Catalog
+
+
+app = typer.Typer(
+    cls=CustomTyperGroup,
+    no_args_is_help=True,
+    short_help="Courses in the submissions catalog",
+    rich_markup_mode="rich",
+)
+
+
+@app.command("add")
+def add(
+        name: str = typer.Argument(..., help="Course name, e.g. Foz-TADS-DesWeb4-2024"),
+    ):
+    """
+    Add a course
+
+    ava course add "Foz-TADS-DesWeb4-2024"
+    """
+    with Catalog() as catalog:
+        added = catalog.add_course(name)
+    console.print(f"[green b]{name}[/]" if added else f"[yellow]{name} already exists")
+
+
+@app.command("ls")
+def ls():
+    """
+    List courses with their submission counts
+
+    ava course ls
+    """
+    with Catalog() as catalog:
+        rows = catalog.courses()
+    table = Table(title="Courses")
+    table.add_column("course", style="bold cyan")
+    table.add_column("assigns", justify="right")
+    table.add_column("submissions", justify="right")
+    for row in rows:
+        table.add_row(row["name"], f"{row['assigns']}", f"{row['submissions']}")
+    console.print(table)
@@ -1,6 +1,6 @@
 import typer
 import rich
-from ava import settings, console, CustomTyperGroup
+from ava import console, CustomTyperGroup
 from typing_extensions import Annotated
 from typer import Context
 
@@ -13,7 +13,7 @@ app = typer.Typer(
 )
 
 
-@app.command("commands", help=f"Debug [green b]{settings.project.name}[/] commands")
+@app.command("commands", help="Debug the CLI commands")
 def commands(
         ctx: Context,
         verbose: Annotated[bool, typer.Option("--verbose", "-v")] = None,
@@ -21,15 +21,17 @@ def commands(
     ):
     """ Debug cli commands """
     from ava.utils import debug_cli
+    from ava.config import get_settings
     verbose and console.log(f'command="{ctx.command_path}"')
-    debug_cli(app, settings.project.name, fmt=fmt, verbose=verbose)
+    debug_cli(app, get_settings().project.name, fmt=fmt, verbose=verbose)
 
 
 @app.command("settings")
 def display_settings(
         key: str = None, 
         verbose:bool=None, 
-        quiet:bool=None
+        quiet:bool=None,
+        no_cache: Annotated[bool, typer.Option("--no-cache", help="Resolve settings again, bypassing the snapshot cache")] = None,
     ):
     """
     Display cli settings
@@ -40,24 +42,21 @@ def display_settings(
         ava settings --key=project
         
         ava settings --key=resources.data.path
+
+        ava settings --key='resources.*.path'
+
+        ava settings --no-cache
     """
-    settings_file=settings.project.path_settings
-    data = settings.model_dump()
-    if key:
-        parts = key.split(".")
-        if len(parts)>1:
-            for i in range(0,len(parts)):
-                data = data.get(parts[i],None)
-                if data is None:
-                    data = f"key not found: [red bold]{key}"
-                    break
-        else:
-            data = data[key] if key in data else f"key not found: [red bold]{key}"
-        
+    from ava.settings_index import get_settings_index
+    index = get_settings_index(use_cache=not no_cache)
+    data = index.query(key) if key else index.to_dict()
+    if key and key not in index and not data:
+        data = f"key not found: [red bold]{key}"
+
     if quiet is None:
         console.print(data)
     if verbose:
-        console.print(f"{settings_file=}")
+        console.print(f"settings_file={index.get('project.path_settings')}")
     return data
 
 
@@ -74,23 +73,20 @@ def list_settings_keys(
         xc settings-key app
 
         xc settings-key gh.api
+
+        xc settings-key 'resources.*'
     """
-    data = settings.model_dump()
-    if name:
-        parts = name.split(".")
-        if len(parts)>1:
-            for i in range(0,len(parts)):
-                data = data.get(parts[i],None)
-                if data is None:
-                    data = f"key not found: [red bold]{name}"
-                    break
-        else:
-            data = data[name] if name in data else f"entry not found: [red bold]{name}"
-        try:
-            data = list(data.keys())
-        except:
-            console.print(f"{name} not found")
-            exit(1)
+    from ava.settings_index import get_settings_index, GLOB_CHARS
+    index = get_settings_index()
+    if GLOB_CHARS.intersection(name):
+        data = {path: index.keys(path) for path in index.glob(name) if index.is_node(path)}
+    elif index.is_node(name):
+        data = index.keys(name)
+    else:
+        data = None
+    if not data:
+        console.print(f"{name} not found")
+        exit(1)
     if quiet is None:
         console.print(f"key=[yellow b]{name}")
         console.print(data)
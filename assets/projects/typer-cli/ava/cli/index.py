@@ -0,0 +1,75 @@
+import typer
+from pathlib import Path
+from rich.table import Table
+from ava import console, CustomTyperGroup
+from ava.index import FileIndex, RefreshStats
+from typing_extensions import Annotated
+
+
+app = typer.Typer(
+    cls=CustomTyperGroup,
+    no_args_is_help=True,
+    short_help="Persistent file index for search_files",
+    rich_markup_mode="rich",
+)
+
+
+def print_refresh(index: FileIndex, stats: RefreshStats):
+    console.print(
+        f"[green b]{index.root}[/]: {stats.files} files "
+        f"(scanned={stats.scanned} unchanged={stats.unchanged} removed={stats.removed} dirs) "
+        f"in {stats.elapsed:.2f}s"
+    )
+
+
+@app.command("build")
+def build(
+        folder: Path = typer.Argument(Path("."), help="Root folder to index"),
+    ):
+    """
+    Scan the whole folder tree into a new index
+
+    ava index build folder
+    """
+    with FileIndex(folder) as index:
+        print_refresh(index, index.build())
+
+
+@app.command("refresh")
+def refresh(
+        folder: Path = typer.Argument(Path("."), help="Root folder to index"),
+    ):
+    """
+    Re-list only the folders that changed since the last run
+
+    ava index refresh folder
+    """
+    with FileIndex(folder) as index:
+        if not index.exists:
+            console.print(f"[yellow]No index for {index.root} yet, building it")
+        print_refresh(index, index.refresh())
+
+
+@app.command("stats")
+def stats(
+        folder: Path = typer.Argument(Path("."), help="Indexed root folder"),
+        verbose: Annotated[bool, typer.Option("--verbose", "-v")] = None,
+    ):
+    """
+    Show index size and contents
+
+    ava index stats folder
+    """
+    with FileIndex(folder) as index:
+        if not index.exists:
+            console.print(f"[red b]No index for {index.root}[/] - run: ava index build")
+            raise typer.Exit(1)
+        info = index.stats()
+    table = Table(title="File index")
+    table.add_column("key", style="bold cyan", justify="right")
+    table.add_column("value", style="green3")
+    for key in ["root", "db", "db_size", "dirs", "files", "size"]:
+        table.add_row(key, f"{info[key]}")
+    console.print(table)
+    if verbose:
+        console.print(info)
@@ -0,0 +1,120 @@
+import sys
+import json
+import typer
+from pathlib import Path
+from typing import Iterator
+from rich.table import Table
+from ava import console, CustomTyperGroup
+from ava.extract import MB
+from ava.extractors import ARCHIVE_PATTERNS
+from ava.output import OutputFormat
+from ava.verify import ArchiveReport, check_archives, list_archive, verify_archive, quarantine
+from typing_extensions import Annotated
+
+
+app = typer.Typer(
+    cls=CustomTyperGroup,
+    no_args_is_help=True,
+    short_help="List and verify archives without extracting them",
+    rich_markup_mode="rich",
+)
+
+
+def find_archives(paths: list[Path], ext: list[str], workers: int) -> Iterator[Path]:
+    """ Archives given as files, or found under the given folders """
+    from ava.utils import iter_files
+    for path in paths:
+        if path.is_dir():
+            yield from iter_files(path, extensions=ext, workers=workers)
+        else:
+            yield path
+
+
+def report_table(reports: list[ArchiveReport], title: str) -> Table:
+    table = Table(title=title)
+    table.add_column("archive", style="bold cyan", overflow="fold")
+    table.add_column("format")
+    table.add_column("files", justify="right")
+    table.add_column("MB", justify="right")
+    table.add_column("largest", overflow="fold")
+    table.add_column("status")
+    for r in reports:
+        status = "[green]ok" if r.ok else f"[red]{r.error}"
+        if r.quarantined:
+            status += f" [yellow](moved to {r.quarantined})"
+        largest = f"{r.largest} ({r.largest_size / MB:.1f} MB)" if r.largest else ""
+        table.add_row(r.archive, r.format or "", f"{r.files}", f"{r.size / MB:.1f}", largest, status)
+    return table
+
+
+def emit(reports, fmt: OutputFormat, title: str) -> list[ArchiveReport]:
+    """ NDJSON lines as reports come, or a table at the end """
+    done = []
+    for report in reports:
+        done.append(report)
+        if fmt == OutputFormat.ndjson:
+            sys.stdout.write(json.dumps(report.to_dict()) + "\n")
+            sys.stdout.flush()
+    if fmt == OutputFormat.rich:
+        console.print(report_table(done, title))
+    return done
+
+
+@app.command("ls")
+def ls(
+        paths: Annotated[list[Path], typer.Argument(help="Archives, or folders to search for archives")] = None,
+        ext: Annotated[list[str], typer.Option("--ext", "-e")] = ARCHIVE_PATTERNS,
+        jobs: Annotated[int, typer.Option("--jobs", "-j", help="Threads reading listings (0 = one per cpu)")] = 0,
+        workers: Annotated[int, typer.Option("--workers", "-w", help="Threads walking the folder tree")] = 0,
+        fmt: Annotated[OutputFormat, typer.Option("--format", help="rich or ndjson")] = OutputFormat.rich,
+    ):
+    """
+    List archives from their central directory: member count, total size, largest member
+
+    ava zip ls data/submissions
+
+    ava zip ls a.zip b.zip --format ndjson
+    """
+    if fmt not in (OutputFormat.rich, OutputFormat.ndjson):
+        raise typer.BadParameter("zip ls supports --format rich or ndjson", param_hint="--format")
+    archives = find_archives(paths or [Path(".")], ext, workers)
+    # listings are mostly I/O: threads are enough
+    reports = emit(check_archives(archives, list_archive, jobs=jobs, processes=False), fmt, "Archives")
+    if not all(r.ok for r in reports):
+        raise typer.Exit(1)
+
+
+@app.command("verify")
+def verify(
+        paths: Annotated[list[Path], typer.Argument(help="Archives, or folders to search for archives")] = None,
+        ext: Annotated[list[str], typer.Option("--ext", "-e")] = ARCHIVE_PATTERNS,
+        jobs: Annotated[int, typer.Option("--jobs", "-j", help="Processes checking CRCs (0 = one per cpu)")] = 0,
+        workers: Annotated[int, typer.Option("--workers", "-w", help="Threads walking the folder tree")] = 0,
+        quarantine_dir: Annotated[Path, typer.Option("--quarantine", help="Move corrupt archives to this folder")] = None,
+        fmt: Annotated[OutputFormat, typer.Option("--format", help="rich or ndjson")] = OutputFormat.rich,
+    ):
+    """
+    Check every member's CRC on a process pool, optionally quarantining corrupt archives
+
+    ava zip verify data/submissions --quarantine data/quarantine
+
+    ava zip verify data/submissions --jobs 8 --format ndjson
+    """
+    if fmt not in (OutputFormat.rich, OutputFormat.ndjson):
+        raise typer.BadParameter("zip verify supports --format rich or ndjson", param_hint="--format")
+    roots = paths or [Path(".")]
+    archives = find_archives(roots, ext, workers)
+
+    def checked():
+        for report in check_archives(archives, verify_archive, jobs=jobs):
+            if not report.ok and quarantine_dir is not None:
+                root = next((r for r in roots if r.is_dir() and Path(report.archive).is_relative_to(r)), None)
+                quarantine(report, quarantine_dir, root)
+            yield report
+
+    reports = emit(checked(), fmt, "Archive verification")
+    failed = sum(not r.ok for r in reports)
+    if fmt == OutputFormat.rich:
+        console.print(f"{len(reports) - failed} ok, [red b]{failed} corrupt[/]" if failed else f"{len(reports)} ok")
+    if failed:
+        raise typer.Exit(1)
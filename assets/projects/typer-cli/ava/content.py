@@ -0,0 +1,106 @@
+import os
+import re
+import mmap
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+SNIFF_SIZE = 8192
+CHUNK_SIZE = 1024 * 1024
+# files up to this size are read at once, larger ones are memory-mapped
+MMAP_THRESHOLD = CHUNK_SIZE
+# how far a regex match may span a chunk boundary in the chunked fallback
+REGEX_OVERLAP = 64 * 1024
+
+
+def content_keywords(keywords: str | list[str] | None) -> list[str]:
+    """ Keywords as a list, without empty ones (they would match every file) """
+    if isinstance(keywords, str):
+        keywords = [keywords]
+    return [k for k in keywords or [] if k]
+
+
+class ContentMatcher:
+    """
+    Match file contents against keywords (any of) or a regex, as bytes.
+
+    Files are never decoded: small files are read at once, large ones are
+    memory-mapped (or read in overlapping chunks when mmap is unavailable).
+    Files larger than `max_size` or with a NUL byte in their first
+    `SNIFF_SIZE` bytes (binary) are rejected without being scanned.
+    """
+    def __init__(
+            self,
+            keywords: str | list[str] = None,
+            regex: str = None,
+            max_size: int = 0,
+            skip_binary: bool = True,
+            encoding: str = "utf-8",
+        ):
+        self.keywords = [k.encode(encoding) for k in content_keywords(keywords)]
+        self.pattern = re.compile(regex.encode(encoding)) if regex else None
+        if not self.keywords and self.pattern is None:
+            raise ValueError("keywords or regex required")
+        self.max_size = max_size
+        self.skip_binary = skip_binary
+        if self.pattern is not None:
+            self.overlap = REGEX_OVERLAP
+        else:
+            self.overlap = max(len(k) for k in self.keywords) - 1
+
+    def search(self, data) -> bool:
+        if self.pattern is not None:
+            return self.pattern.search(data) is not None
+        return any(data.find(k) != -1 for k in self.keywords)
+
+    def match(self, path: str | os.PathLike) -> bool:
+        try:
+            size = os.stat(path).st_size
+            if self.max_size > 0 and size > self.max_size:
+                return False
+            with open(path, 'rb') as f:
+                head = f.read(SNIFF_SIZE)
+                if self.skip_binary and b"\0" in head:
+                    return False
+                if size <= MMAP_THRESHOLD:
+                    return self.search(head + f.read())
+                try:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        return self.search(mm)
+                except (ValueError, OSError):
+                    f.seek(0)
+                    return self._search_chunks(f)
+        except OSError:
+            return False
+
+    def _search_chunks(self, f) -> bool:
+        tail = b""
+        while chunk := f.read(CHUNK_SIZE):
+            data = tail + chunk
+            if self.search(data):
+                return True
+            tail = data[-self.overlap:] if self.overlap > 0 else b""
+        return False
+
+    def filter(self, paths: Iterable, workers: int = 0) -> Iterator:
+        """
+        Yield the paths whose content matches, in input order.
+
+        With `workers > 1` files are scanned on a thread pool, keeping a
+        bounded window of files in flight so `paths` is consumed lazily.
+        """
+        if workers <= 1:
+            yield from (p for p in paths if self.match(p))
+            return
+        window = deque()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for p in paths:
+                window.append((p, pool.submit(self.match, p)))
+                if len(window) >= workers * 4:
+                    p, future = window.popleft()
+                    if future.result():
+                        yield p
+            while window:
+                p, future = window.popleft()
+                if future.result():
+                    yield p
@@ -0,0 +1,174 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+from enum import Enum
+from pathlib import Path
+from dataclasses import dataclass
+from typing import IO
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+CHUNK_SIZE = 1024 * 1024
+# store folder under `settings.resources.data.path`
+STORE_DIRNAME = "store"
+# linux ioctl cloning a file's extents (btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+
+def new_hasher():
+    """ xxh3-128 when `xxhash` is installed, BLAKE2b otherwise """
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=20)
+
+
+class LinkMode(str, Enum):
+    hardlink = "hardlink"
+    reflink = "reflink"
+
+
+@dataclass
+class DedupStats:
+    files: int = 0
+    duplicates: int = 0
+    bytes: int = 0
+    bytes_saved: int = 0
+    copies: int = 0
+
+
+def _reflink(src: Path, dst: Path):
+    import fcntl
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+
+class ContentStore:
+    """
+    Content-addressed store of extracted files.
+
+    Each member is hashed while it is streamed into the store; identical
+    content is kept once under `objects/` and every extracted copy is a
+    hardlink (shared inode: editing one copy edits all of them) or a
+    reflink (copy-on-write, needs btrfs/xfs). When linking is impossible
+    (other filesystem) the object is copied.
+    """
+    def __init__(self, root: Path, link: LinkMode = LinkMode.hardlink):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.tmp = self.root / "tmp"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.tmp.mkdir(parents=True, exist_ok=True)
+        self.link = LinkMode(link)
+        self.stats = DedupStats()
+        self._lock = threading.Lock()
+
+    def same_filesystem(self, folder: Path) -> bool:
+        """
+        Whether links from the store can reach `folder`: on another
+        filesystem every copy would be written twice (object + copy)
+        """
+        return os.stat(self.root).st_dev == os.stat(folder).st_dev
+
+    def gc(self, dry_run: bool = False) -> tuple[int, int]:
+        """
+        Delete objects no extracted file links to anymore (link count 1),
+        returns (objects, bytes). Reflinks share extents, not inodes, so
+        reflinked objects cannot be counted and are never collected.
+        """
+        if self.link != LinkMode.hardlink:
+            return 0, 0
+        removed = freed = 0
+        for folder in self.objects.iterdir():
+            for obj in folder.iterdir():
+                st = obj.stat()
+                if st.st_nlink > 1:
+                    continue
+                removed += 1
+                freed += st.st_size
+                if not dry_run:
+                    obj.unlink()
+        return removed, freed
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest[2:]
+
+    def write(self, src: IO[bytes], target: Path, guard=None, chunk_size: int = CHUNK_SIZE) -> int:
+        """ Stream `src` into the store and materialize it at `target` """
+        hasher = new_hasher()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.tmp)
+        try:
+            with os.fdopen(fd, 'wb') as dst:
+                while chunk := src.read(chunk_size):
+                    guard and guard.add(len(chunk))
+                    hasher.update(chunk)
+                    dst.write(chunk)
+                    size += len(chunk)
+            self._store(tmp, hasher.hexdigest(), size, target)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return size
+
+    def absorb(self, path: Path) -> int:
+        """ Move an already extracted file into the store, leaving a link """
+        with open(path, 'rb') as src:
+            hasher = new_hasher()
+            size = 0
+            while chunk := src.read(CHUNK_SIZE):
+                hasher.update(chunk)
+                size += len(chunk)
+        fd, tmp = tempfile.mkstemp(dir=self.tmp)
+        os.close(fd)
+        try:
+            try:
+                os.replace(path, tmp)
+            except OSError:
+                # other filesystem
+                shutil.copyfile(path, tmp)
+                os.unlink(path)
+            self._store(tmp, hasher.hexdigest(), size, path)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        return size
+
+    def _store(self, tmp: str, digest: str, size: int, target: Path):
+        obj = self.object_path(digest)
+        with self._lock:
+            duplicate = obj.exists()
+            if not duplicate:
+                obj.parent.mkdir(exist_ok=True)
+                os.replace(tmp, obj)
+        linked = self.materialize(obj, target)
+        with self._lock:
+            self.stats.files += 1
+            self.stats.bytes += size
+            if duplicate:
+                self.stats.duplicates += 1
+                self.stats.bytes_saved += size if linked else 0
+            if not linked:
+                self.stats.copies += 1
+
+    def materialize(self, obj: Path, target: Path) -> bool:
+        """ Link `obj` at `target`, returns False when it had to be copied """
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists() or target.is_symlink():
+            target.unlink()
+        try:
+            if self.link == LinkMode.reflink:
+                _reflink(obj, target)
+            else:
+                os.link(obj, target)
+            return True
+        except OSError:
+            # cross-device, unsupported reflink or too many links: plain copy
+            if target.exists():
+                target.unlink()
+        shutil.copyfile(obj, target)
+        return False
@@ -0,0 +1,252 @@
+import os
+import time
+import shutil
+import tarfile
+import tempfile
+import zipfile
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable
+from ava.profiling import span
+from ava.dedup import ContentStore
+from ava.extractors import (
+    DECOMPRESS_ERRORS,
+    ExtractError,
+    ExtractGuard,
+    ExtractLimits,
+    open_extractor,
+    safe_target,
+)
+
+MB = 1024 * 1024
+# staging folders of archives being extracted, see `extract_archive`
+STAGING_PREFIX = ".ava-extract-"
+
+
+@dataclass
+class ExtractResult:
+    """ Outcome of a single archive extraction """
+    archive: Path
+    dest: Path
+    files: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+    error: str | None = None
+    outputs: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes / MB / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass
+class ExtractStats:
+    """ Aggregated throughput of an extraction run """
+    archives: int = 0
+    failed: int = 0
+    files: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+    def add(self, result: ExtractResult):
+        self.archives += 1
+        if not result.ok:
+            self.failed += 1
+            return
+        self.files += result.files
+        self.bytes += result.bytes
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes / MB / self.elapsed if self.elapsed > 0 else 0.0
+
+    def table(self):
+        from rich.table import Table
+        table = Table(title="Extraction summary")
+        table.add_column("archives", style="bold cyan", justify="right")
+        table.add_column("failed", style="red", justify="right")
+        table.add_column("files", justify="right")
+        table.add_column("MB", justify="right")
+        table.add_column("seconds", justify="right")
+        table.add_column("files/s", style="green3", justify="right")
+        table.add_column("MB/s", style="green3", justify="right")
+        table.add_row(
+            f"{self.archives}",
+            f"{self.failed}",
+            f"{self.files}",
+            f"{self.bytes / MB:.1f}",
+            f"{self.elapsed:.2f}",
+            f"{self.files_per_sec:.1f}",
+            f"{self.mb_per_sec:.1f}",
+        )
+        return table
+
+
+class ByteBudget:
+    """
+    Caps the total size of archives being extracted at the same time.
+
+    A single archive larger than the limit is still admitted once nothing
+    else is in flight, so the budget never deadlocks.
+    """
+    def __init__(self, limit: int = 0):
+        self.limit = limit
+        self.inflight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, size: int):
+        if self.limit <= 0:
+            return
+        with self._cond:
+            while self.inflight > 0 and self.inflight + size > self.limit:
+                self._cond.wait()
+            self.inflight += size
+
+    def release(self, size: int):
+        if self.limit <= 0:
+            return
+        with self._cond:
+            self.inflight -= size
+            self._cond.notify_all()
+
+
+def _merge_into(staging: Path, dest: Path):
+    """ Move the staged files into `dest`, replacing existing files """
+    for root, _, files in os.walk(staging):
+        target_root = dest / os.path.relpath(root, staging)
+        target_root.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            os.replace(os.path.join(root, name), target_root / name)
+
+
+def extract_archive(
+        archive: Path,
+        dest: Path = None,
+        limits: ExtractLimits = None,
+        store: ContentStore = None,
+        claim: Callable[[Path], None] = None,
+    ) -> ExtractResult:
+    """
+    Extract one archive (to its own folder by default) with the backend
+    matching its magic bytes
+
+    Members are written to a staging folder next to `dest` and only moved
+    into place once the whole archive succeeded, so a failed or aborted
+    (over `limits`) archive leaves no partial output behind. With a
+    `store`, identical members are kept once and linked (see `ContentStore`).
+    `claim` is called with every output path before it lands in `dest`.
+    """
+    with span("extract archive"):
+        return _extract_archive(archive, dest, limits, store, claim)
+
+
+def _extract_archive(
+        archive: Path,
+        dest: Path,
+        limits: ExtractLimits,
+        store: ContentStore,
+        claim: Callable[[Path], None] = None,
+    ) -> ExtractResult:
+    dest = dest or archive.parent
+    result = ExtractResult(archive=archive, dest=dest)
+    start = time.perf_counter()
+    staging = None
+    try:
+        guard = ExtractGuard(limits, archive.stat().st_size) if limits else None
+        dest.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=dest))
+        members = [m for m in open_extractor(archive).extract(staging, guard, store) if not m.is_dir]
+        outputs = [safe_target(dest, m.name) for m in members]
+        if claim is not None:
+            # before the move: a walk or watch of `dest` may see them right after
+            for output in outputs:
+                claim(output)
+        _merge_into(staging, dest)
+        result.files = len(members)
+        result.bytes = sum(m.size for m in members)
+        result.outputs = [str(output.relative_to(dest)) for output in outputs]
+    except (OSError, EOFError, RuntimeError, zipfile.BadZipFile, tarfile.TarError, ExtractError, *DECOMPRESS_ERRORS) as e:
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def extract_archives(
+        archives: Iterable[Path],
+        jobs: int = 1,
+        max_inflight: int = 0,
+        on_result: Callable[[ExtractResult], None] = None,
+        limits: ExtractLimits = None,
+        store: ContentStore = None,
+        claim: Callable[[Path], None] = None,
+    ) -> ExtractStats:
+    """
+    Extract archives on a thread pool while they are still being produced.
+
+    `archives` may be a lazy iterator (e.g. `iter_files`), so extraction
+    starts as soon as the walk yields the first archive. `max_inflight`
+    caps the bytes of archives being extracted at once (0 = no limit).
+    Results are handed to `on_result` on the calling thread. `limits`
+    guards every archive (see `ExtractGuard`), `store` deduplicates members,
+    `claim` gets every output path before it is moved into place (called
+    on the worker threads).
+    A never-ending source (`ArchiveWatcher`) yields `None` when idle so
+    finished archives are reported without waiting for the next one.
+    """
+    jobs = max(1, jobs)
+    stats = ExtractStats()
+    budget = ByteBudget(max_inflight)
+    start = time.perf_counter()
+
+    def run(archive: Path, size: int) -> ExtractResult:
+        try:
+            return extract_archive(archive, limits=limits, store=store, claim=claim)
+        finally:
+            budget.release(size)
+
+    def collect(futures):
+        for future in futures:
+            result = future.result()
+            stats.add(result)
+            on_result and on_result(result)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = set()
+        for archive in archives:
+            if archive is None:
+                done = {future for future in pending if future.done()}
+                pending -= done
+                collect(done)
+                continue
+            try:
+                size = archive.stat().st_size
+            except OSError:
+                size = 0
+            budget.acquire(size)
+            pending.add(pool.submit(run, archive, size))
+            # keep the walk at most a couple of archives ahead of the workers
+            if len(pending) >= jobs * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        done, _ = wait(pending)
+        collect(done)
+
+    stats.elapsed = time.perf_counter() - start
+    return stats
@@ -0,0 +1,468 @@
+import os
+import lzma
+import zlib
+import shutil
+import tarfile
+import zipfile
+import subprocess
+from pathlib import Path
+from dataclasses import dataclass
+from typing import IO, Iterator
+
+CHUNK_SIZE = 1024 * 1024
+# enough to see the tar "ustar" magic at offset 257
+SNIFF_SIZE = 512
+# corrupt compressed data: raised while reading a member, not while listing
+DECOMPRESS_ERRORS = (zlib.error, lzma.LZMAError)
+
+# default patterns of `ava unzip-all`
+ARCHIVE_PATTERNS = [
+    '*.zip', '*.rar', '*.7z',
+    '*.tar', '*.tar.gz', '*.tgz', '*.tar.bz2', '*.tar.xz', '*.tar.zst',
+]
+
+
+class ExtractError(Exception):
+    """ An archive could not be listed or extracted """
+
+
+class ExtractAborted(ExtractError):
+    """ An archive went over the extraction limits """
+
+
+@dataclass
+class Member:
+    """ One entry of an archive """
+    name: str
+    size: int = 0
+    compressed: int | None = None
+    is_dir: bool = False
+
+
+def is_archive_name(name: str) -> bool:
+    return name.lower().endswith(tuple(p.lstrip("*") for p in ARCHIVE_PATTERNS))
+
+
+@dataclass
+class ExtractLimits:
+    """ Budgets of one archive extraction (0 = no limit) """
+    max_total_bytes: int = 0
+    max_member_bytes: int = 0
+    max_members: int = 0
+    max_ratio: float = 0
+    reject_nested: bool = False
+
+
+class ExtractGuard:
+    """
+    Enforces `ExtractLimits` on one archive: first against the declared
+    listing (central directory), then with running counters while members
+    are written, since declared sizes can lie.
+    """
+    def __init__(self, limits: ExtractLimits, archive_size: int):
+        self.limits = limits
+        self.archive_size = max(archive_size, 1)
+        self.total = 0
+        self.member_bytes = 0
+        self.members = 0
+
+    def check_listing(self, members: list[Member]):
+        limits = self.limits
+        files = [m for m in members if not m.is_dir]
+        if limits.max_members and len(files) > limits.max_members:
+            raise ExtractAborted(f"{len(files)} members > max {limits.max_members}")
+        declared = sum(m.size for m in files)
+        if limits.max_total_bytes and declared > limits.max_total_bytes:
+            raise ExtractAborted(f"declared size {declared} bytes > max {limits.max_total_bytes}")
+        if limits.max_ratio and declared / self.archive_size > limits.max_ratio:
+            raise ExtractAborted(f"compression ratio {declared / self.archive_size:.0f} > max {limits.max_ratio:g}")
+        for m in files:
+            self._check_member(m)
+            if limits.max_member_bytes and m.size > limits.max_member_bytes:
+                raise ExtractAborted(f"{m.name}: {m.size} bytes > max {limits.max_member_bytes}")
+            if limits.max_ratio and m.compressed and m.size / m.compressed > limits.max_ratio:
+                raise ExtractAborted(f"{m.name}: compression ratio {m.size / m.compressed:.0f} > max {limits.max_ratio:g}")
+
+    def _check_member(self, member: Member):
+        if self.limits.reject_nested and is_archive_name(member.name):
+            raise ExtractAborted(f"nested archive: {member.name}")
+
+    def start_member(self, member: Member):
+        self._check_member(member)
+        self.members += 1
+        self.member_bytes = 0
+        if self.limits.max_members and self.members > self.limits.max_members:
+            raise ExtractAborted(f"more than {self.limits.max_members} members")
+
+    def add(self, size: int):
+        """ count bytes written, aborting as soon as a budget is exceeded """
+        limits = self.limits
+        self.total += size
+        self.member_bytes += size
+        if limits.max_total_bytes and self.total > limits.max_total_bytes:
+            raise ExtractAborted(f"wrote more than {limits.max_total_bytes} bytes")
+        if limits.max_member_bytes and self.member_bytes > limits.max_member_bytes:
+            raise ExtractAborted(f"member larger than {limits.max_member_bytes} bytes")
+        if limits.max_ratio and self.total / self.archive_size > limits.max_ratio:
+            raise ExtractAborted(f"compression ratio over {limits.max_ratio:g}")
+
+
+def safe_target(dest: Path, name: str) -> Path:
+    """
+    Path of a member under `dest`, dropping absolute prefixes and `..`
+    components like `zipfile.extractall` does
+    """
+    parts = [p for p in name.replace("\\", "/").split("/") if p not in ("", ".", "..")]
+    if not parts:
+        raise ExtractError(f"invalid member name: {name!r}")
+    return dest.joinpath(*parts)
+
+
+def copy_stream(
+        src: IO[bytes],
+        target: Path,
+        guard: ExtractGuard = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> int:
+    """ Write a member to disk in bounded chunks, returns the bytes written """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(target, 'wb') as dst:
+        while chunk := src.read(chunk_size):
+            guard and guard.add(len(chunk))
+            dst.write(chunk)
+            written += len(chunk)
+    return written
+
+
+class Extractor:
+    """
+    Archive backend. Subclasses declare the magic bytes they recognise as
+    `(offset, bytes)` pairs and the suffixes used as a fallback.
+    """
+    name: str = ""
+    magic: list[tuple[int, bytes]] = []
+    suffixes: tuple[str, ...] = ()
+
+    def __init__(self, archive: Path):
+        self.archive = Path(archive)
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    @classmethod
+    def sniff(cls, head: bytes) -> bool:
+        return any(head[offset:offset + len(m)] == m for offset, m in cls.magic)
+
+    def members(self) -> list[Member]:
+        raise NotImplementedError
+
+    def verify(self):
+        """ Read every member and check its checksums, raises `ExtractError` """
+        raise NotImplementedError
+
+    def extract(self, dest: Path, guard: ExtractGuard = None, store=None) -> list[Member]:
+        """
+        Extract every member under `dest`, returns the extracted members.
+        With a `store` (`ava.dedup.ContentStore`) members are written
+        through it and deduplicated.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def write_member(src: IO[bytes], target: Path, guard: ExtractGuard = None, store=None) -> int:
+        if store is not None:
+            return store.write(src, target, guard)
+        return copy_stream(src, target, guard)
+
+
+EXTRACTORS: list[type[Extractor]] = []
+
+
+def register_extractor(cls: type[Extractor]) -> type[Extractor]:
+    """ Class decorator adding a backend to the registry """
+    EXTRACTORS.append(cls)
+    return cls
+
+
+def detect_extractor(archive: Path) -> type[Extractor] | None:
+    """ Backend for an archive, by magic bytes first, then by suffix """
+    with open(archive, 'rb') as f:
+        head = f.read(SNIFF_SIZE)
+    for cls in EXTRACTORS:
+        if cls.sniff(head) and cls.available():
+            return cls
+    name = Path(archive).name.lower()
+    for cls in EXTRACTORS:
+        if name.endswith(cls.suffixes) and cls.available():
+            return cls
+    return None
+
+
+def open_extractor(archive: Path) -> Extractor:
+    cls = detect_extractor(archive)
+    if cls is None:
+        raise ExtractError(f"unsupported archive format: {Path(archive).name}")
+    return cls(archive)
+
+
+# ============================================================
+@register_extractor
+class ZipExtractor(Extractor):
+    name = "zip"
+    magic = [(0, b"PK\x03\x04"), (0, b"PK\x05\x06")]
+    suffixes = (".zip",)
+
+    def members(self) -> list[Member]:
+        with zipfile.ZipFile(self.archive) as zf:
+            return [
+                Member(info.filename, info.file_size, info.compress_size, info.is_dir())
+                for info in zf.infolist()
+            ]
+
+    def verify(self):
+        try:
+            with zipfile.ZipFile(self.archive) as zf:
+                bad = zf.testzip()
+        except (zipfile.BadZipFile, EOFError, NotImplementedError, *DECOMPRESS_ERRORS) as e:
+            raise ExtractError(f"{type(e).__name__}: {e}") from e
+        if bad is not None:
+            raise ExtractError(f"bad CRC: {bad}")
+
+    def extract(self, dest: Path, guard: ExtractGuard = None, store=None) -> list[Member]:
+        with zipfile.ZipFile(self.archive) as zf:
+            members = [
+                Member(info.filename, info.file_size, info.compress_size, info.is_dir())
+                for info in zf.infolist()
+            ]
+            # the central directory is checked before writing anything
+            guard and guard.check_listing(members)
+            for info, member in zip(zf.infolist(), members):
+                target = safe_target(dest, info.filename)
+                if member.is_dir:
+                    target.mkdir(parents=True, exist_ok=True)
+                    continue
+                guard and guard.start_member(member)
+                with zf.open(info) as src:
+                    self.write_member(src, target, guard, store)
+        return members
+
+
+def _zstd_reader(f: IO[bytes]) -> IO[bytes]:
+    """ Streaming zstd decompression (Python 3.14+ or the `zstandard` package) """
+    try:
+        from compression import zstd
+        return zstd.ZstdFile(f)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ExtractError("zstd archives need Python 3.14+ or the 'zstandard' package")
+    return zstandard.ZstdDecompressor().stream_reader(f)
+
+
+@register_extractor
+class TarExtractor(Extractor):
+    """ tar, optionally gzip/bz2/xz/zstd compressed, read as a stream """
+    name = "tar"
+    ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+    magic = [
+        (257, b"ustar"),
+        (0, b"\x1f\x8b"),       # gzip
+        (0, b"BZh"),            # bzip2
+        (0, b"\xfd7zXZ\x00"),   # xz
+        (0, ZSTD_MAGIC),
+    ]
+    suffixes = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz", ".tar.zst", ".tzst")
+
+    def _open(self, f: IO[bytes]) -> tarfile.TarFile:
+        head = f.read(4)
+        f.seek(0)
+        if head == self.ZSTD_MAGIC:
+            return tarfile.open(fileobj=_zstd_reader(f), mode="r|")
+        return tarfile.open(fileobj=f, mode="r|*")
+
+    def _iter(self) -> Iterator[tuple[tarfile.TarFile, tarfile.TarInfo]]:
+        with open(self.archive, 'rb') as f, self._open(f) as tar:
+            for info in tar:
+                yield tar, info
+
+    def members(self) -> list[Member]:
+        return [
+            Member(info.name, info.size, None, info.isdir())
+            for _, info in self._iter() if info.isfile() or info.isdir()
+        ]
+
+    def verify(self):
+        # reading the stream to the end checks the gzip/bz2/xz/zstd checksums
+        try:
+            for tar, info in self._iter():
+                if info.isfile():
+                    src = tar.extractfile(info)
+                    while src.read(CHUNK_SIZE):
+                        pass
+        except (tarfile.TarError, EOFError, OSError, ValueError, *DECOMPRESS_ERRORS) as e:
+            raise ExtractError(f"{type(e).__name__}: {e}") from e
+
+    def extract(self, dest: Path, guard: ExtractGuard = None, store=None) -> list[Member]:
+        # a tar stream has no central directory: limits apply while reading
+        members = []
+        for tar, info in self._iter():
+            # links and devices are skipped: they could point outside `dest`
+            if not (info.isfile() or info.isdir()):
+                continue
+            member = Member(info.name, info.size, None, info.isdir())
+            target = safe_target(dest, info.name)
+            if member.is_dir:
+                target.mkdir(parents=True, exist_ok=True)
+            else:
+                guard and guard.start_member(member)
+                self.write_member(tar.extractfile(info), target, guard, store)
+            members.append(member)
+        return members
+
+
+class ToolExtractor(Extractor):
+    """ Backend delegating to an external tool (7z, unrar, bsdtar) found on PATH """
+    tools: tuple[str, ...] = ()
+
+    @classmethod
+    def tool(cls) -> str | None:
+        for name in cls.tools:
+            if path := shutil.which(name):
+                return path
+        return None
+
+    @classmethod
+    def available(cls) -> bool:
+        return cls.tool() is not None
+
+    def run(self, *args: str) -> str:
+        proc = subprocess.run(
+            [self.tool(), *args],
+            capture_output=True, text=True, errors="replace",
+        )
+        if proc.returncode != 0:
+            raise ExtractError(f"{Path(self.tool()).name} failed ({proc.returncode}): {proc.stderr.strip()}")
+        return proc.stdout
+
+    @property
+    def tool_name(self) -> str:
+        return Path(self.tool()).name
+
+    def _members_names(self, *args: str) -> list[Member]:
+        """ bare name listings (unrar, bsdtar): sizes are unknown """
+        return [
+            Member(name, is_dir=name.endswith("/"))
+            for name in self.run(*args, str(self.archive)).splitlines() if name
+        ]
+
+    def _extract(self, dest: Path):
+        raise NotImplementedError
+
+    def verify(self):
+        """ The tool's own test command, bsdtar extracts to /dev/null """
+        if self.tool_name == "bsdtar":
+            args = ["-xOf", str(self.archive)]
+        elif self.tool_name == "unrar":
+            args = ["t", "-idq", str(self.archive)]
+        else:
+            args = ["t", str(self.archive)]
+        proc = subprocess.run(
+            [self.tool(), *args],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors="replace",
+        )
+        if proc.returncode != 0:
+            raise ExtractError(f"{self.tool_name} test failed ({proc.returncode}): {proc.stderr.strip()}")
+
+    def extract(self, dest: Path, guard: ExtractGuard = None, store=None) -> list[Member]:
+        """
+        Let the tool extract, then fill the sizes a bare listing could not
+        tell from the extracted files. Limits are checked on the listing
+        and, the tool writing on its own, on the result. Deduplication
+        moves the extracted files into the store afterwards.
+        """
+        members = self.members()
+        guard and guard.check_listing(members)
+        dest.mkdir(parents=True, exist_ok=True)
+        self._extract(dest)
+        for m in members:
+            if m.is_dir:
+                continue
+            if not m.size:
+                try:
+                    m.size = safe_target(dest, m.name).stat().st_size
+                except (OSError, ExtractError):
+                    pass
+            if guard:
+                guard.start_member(m)
+                guard.add(m.size)
+        if store is not None:
+            for m in members:
+                target = safe_target(dest, m.name)
+                if not m.is_dir and target.is_file() and not target.is_symlink():
+                    store.absorb(target)
+        return members
+
+    def _members_7z(self) -> list[Member]:
+        """ parse `7z l -slt`: blocks of `Key = value` lines per member """
+        members, entry = [], {}
+        listing = self.run("l", "-slt", "-ba", str(self.archive))
+        for line in [*listing.splitlines(), ""]:
+            if not line.strip():
+                if "Path" in entry:
+                    members.append(Member(
+                        entry["Path"],
+                        int(entry.get("Size") or 0),
+                        int(entry["Packed Size"]) if entry.get("Packed Size") else None,
+                        entry.get("Folder") == "+" or "D" in entry.get("Attributes", "")[:1],
+                    ))
+                entry = {}
+                continue
+            key, _, value = line.partition(" = ")
+            entry[key.strip()] = value.strip()
+        return members
+
+
+@register_extractor
+class SevenZipExtractor(ToolExtractor):
+    name = "7z"
+    magic = [(0, b"7z\xbc\xaf\x27\x1c")]
+    suffixes = (".7z",)
+    tools = ("7z", "7zz", "7za", "bsdtar")
+
+    def members(self) -> list[Member]:
+        if self.tool_name == "bsdtar":
+            return self._members_names("-tf")
+        return self._members_7z()
+
+    def _extract(self, dest: Path):
+        if self.tool_name == "bsdtar":
+            self.run("-xf", str(self.archive), "-C", str(dest))
+        else:
+            self.run("x", "-y", f"-o{dest}", str(self.archive))
+
+
+@register_extractor
+class RarExtractor(ToolExtractor):
+    name = "rar"
+    magic = [(0, b"Rar!\x1a\x07")]
+    suffixes = (".rar",)
+    tools = ("7z", "7zz", "unrar", "bsdtar")
+
+    def members(self) -> list[Member]:
+        if self.tool_name == "unrar":
+            return self._members_names("lb")
+        if self.tool_name == "bsdtar":
+            return self._members_names("-tf")
+        return self._members_7z()
+
+    def _extract(self, dest: Path):
+        if self.tool_name == "unrar":
+            self.run("x", "-o+", "-y", str(self.archive), f"{dest}{os.sep}")
+        elif self.tool_name == "bsdtar":
+            self.run("-xf", str(self.archive), "-C", str(dest))
+        else:
+            self.run("x", "-y", f"-o{dest}", str(self.archive))
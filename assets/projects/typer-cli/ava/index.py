@@ -0,0 +1,207 @@
+import os
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Iterator
+
+INDEX_DIRNAME = "index"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT,
+    name TEXT,
+    suffix TEXT,
+    size INTEGER,
+    mtime_ns INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs(parent);
+"""
+
+
+def index_path(root: Path) -> Path:
+    """ Index database of a root folder, under the user config dir """
+    from ava import context
+    root = os.path.abspath(root)
+    digest = hashlib.blake2b(root.encode(), digest_size=8).hexdigest()
+    return context.USER_CONFIG_PATH / INDEX_DIRNAME / f"{digest}.db"
+
+
+@dataclass
+class RefreshStats:
+    scanned: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    files: int = 0
+    elapsed: float = 0.0
+
+
+class FileIndex:
+    """
+    On-disk (SQLite) index of every file under a root folder: path, size,
+    mtime and suffix.
+
+    `refresh` only re-lists folders whose mtime changed since the last run,
+    so it costs one stat per folder. A folder mtime changes when entries are
+    added, removed or renamed; files rewritten in place keep stale size and
+    mtime until their folder is re-listed (`build` rescans everything).
+    """
+    def __init__(self, root: Path, db_path: Path = None):
+        self.root = os.path.abspath(root)
+        self.db_path = Path(db_path or index_path(self.root))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def exists(self) -> bool:
+        return self.meta("refreshed_at") is not None
+
+    def meta(self, key: str) -> str | None:
+        row = self.db.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+
+    def build(self) -> RefreshStats:
+        """ Drop the index and scan the whole tree """
+        with self.db:
+            self.db.execute("DELETE FROM files")
+            self.db.execute("DELETE FROM dirs")
+            self._set_meta("built_at", time.time())
+        return self.refresh()
+
+    def _list_dir(self, path: str) -> list[str]:
+        """ Re-list one folder into the index, returns its subfolders """
+        files, subdirs = [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    name = entry.name
+                    files.append((
+                        entry.path, path, name, os.path.splitext(name)[1],
+                        st.st_size, st.st_mtime_ns,
+                    ))
+        except OSError:
+            pass
+        self.db.execute("DELETE FROM files WHERE dir=?", (path,))
+        self.db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", files)
+        return subdirs
+
+    def refresh(self) -> RefreshStats:
+        """ Re-list only the folders whose mtime changed """
+        stats = RefreshStats()
+        start = time.perf_counter()
+        known = {}
+        children: dict[str, list[str]] = {}
+        for path, parent, mtime_ns in self.db.execute("SELECT path, parent, mtime_ns FROM dirs"):
+            known[path] = mtime_ns
+            children.setdefault(parent, []).append(path)
+
+        seen = set()
+        stack = [self.root]
+        with self.db:
+            while stack:
+                path = stack.pop()
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(path)
+                if known.get(path) == mtime_ns:
+                    stats.unchanged += 1
+                    stack.extend(children.get(path, []))
+                    continue
+                stats.scanned += 1
+                subdirs = self._list_dir(path)
+                parent = os.path.dirname(path) if path != self.root else None
+                self.db.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", (path, parent, mtime_ns))
+                stack.extend(subdirs)
+
+            gone = [path for path in known if path not in seen]
+            stats.removed = len(gone)
+            for path in gone:
+                self.db.execute("DELETE FROM dirs WHERE path=?", (path,))
+                self.db.execute("DELETE FROM files WHERE dir=?", (path,))
+            self._set_meta("root", self.root)
+            self._set_meta("refreshed_at", time.time())
+
+        stats.files = self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    def query(
+            self,
+            extensions: list = ['*'],
+            ignore_extensions: list = None,
+            ignore_parts: list[str] = None,
+            max_files: int = 0,
+            sort_files: bool = True,
+        ) -> Iterator[str]:
+        """
+        Yield indexed paths matching the same criterias as `search_files`
+        """
+        ignore_extensions = list(ignore_extensions or [])
+        ignore_parts = set(ignore_parts or [])
+        if ignore_parts.intersection(Path(self.root).parts):
+            return
+        # sqlite GLOB is fnmatch with `^` for negated classes
+        globs = [ext.replace("[!", "[^") for ext in extensions]
+        sql = "SELECT path FROM files WHERE (" + " OR ".join("name GLOB ?" for _ in globs) + ")"
+        params = list(globs)
+        if ignore_extensions:
+            sql += f" AND suffix NOT IN ({', '.join('?' for _ in ignore_extensions)})"
+            params += ignore_extensions
+        if sort_files:
+            sql += " ORDER BY path"
+        start = len(self.root) + 1
+        found = 0
+        for (path,) in self.db.execute(sql, params):
+            if ignore_parts and not ignore_parts.isdisjoint(path[start:].split(os.sep)):
+                continue
+            yield path
+            found += 1
+            if max_files > 0 and found >= max_files:
+                return
+
+    def stats(self) -> dict:
+        files, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files").fetchone()
+        dirs = self.db.execute("SELECT COUNT(*) FROM dirs").fetchone()[0]
+        suffixes = self.db.execute(
+            "SELECT suffix, COUNT(*) AS n FROM files GROUP BY suffix ORDER BY n DESC LIMIT 10"
+        ).fetchall()
+        return {
+            "root": self.root,
+            "db": str(self.db_path),
+            "db_size": self.db_path.stat().st_size,
+            "dirs": dirs,
+            "files": files,
+            "size": size,
+            "built_at": self.meta("built_at"),
+            "refreshed_at": self.meta("refreshed_at"),
+            "suffixes": dict(suffixes),
+        }
@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+
+LOG_FILENAME = "ava.log.jsonl"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+
+LEVELS = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+# lowest level any sink accepts, None while logging is off: `enabled` and
+# `file_event` check it before building a message or touching loguru,
+# which is only imported by `setup_logging` (startup stays lazy)
+_min_level: int | None = None
+_limiter: "RateLimiter | None" = None
+_logger = None
+# loguru handlers added by the last `setup_logging`: only these are removed
+# on the next call, sinks of a host application are left alone
+_handler_ids: list[int] = []
+# set by the `ava` entry point, which owns the process: loguru's default
+# stderr handler (id 0) is then replaced instead of duplicating the output
+REPLACE_DEFAULT_HANDLER = False
+
+
+class RateLimiter:
+    """
+    Token bucket: `rate` events per second with bursts of up to `rate`.
+    Rejected events are counted and reported by the next accepted one.
+    """
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.last = time.monotonic()
+        self.suppressed = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> int | None:
+        """ Events suppressed since the last accepted one, or None to drop this one """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens < 1:
+                self.suppressed += 1
+                return None
+            self.tokens -= 1
+            suppressed, self.suppressed = self.suppressed, 0
+            return suppressed
+
+
+class JsonlSink:
+    """
+    One JSON object per line: time, level, message and the bound fields.
+    Called from loguru's queue worker (`enqueue=True`), so encoding and
+    writing stay off the logging thread. A file above `max_bytes` is
+    rotated to `<name>.1` when opened.
+    """
+    def __init__(self, path: Path, max_bytes: int = LOG_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if self.path.stat().st_size > max_bytes:
+                os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+        except OSError:
+            pass
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def write(self, message):
+        record = message.record
+        entry = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": record["message"],
+            **record["extra"],
+        }
+        if record["exception"] is not None:
+            entry["exception"] = str(message).rstrip("\n")
+        self.file.write(json.dumps(entry, default=str) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def stop(self):
+        self.file.close()
+
+
+def setup_logging(app, config_path: Path, force: bool = None) -> bool:
+    """
+    Configure loguru from the [app] settings: a JSON-lines file under
+    `config_path` and stderr, each with its own level, both enqueued so
+    log calls only pay for a queue put. Both only take `ava` records.
+    `force` (ava.LOGGER_ENABLE) overrides `app.logger_enabled`. Calling it
+    again replaces the handlers of the previous call, not other sinks.
+    Returns whether logging is on.
+    """
+    global _min_level, _limiter, _logger
+    from loguru import logger
+    from ava import MAIN_MODULE
+    enabled = force if force is not None else bool(app and app.logger_enabled)
+    remove = _handler_ids + [0] if REPLACE_DEFAULT_HANDLER else _handler_ids
+    for handler_id in remove:
+        try:
+            logger.remove(handler_id)
+        except ValueError:
+            pass
+    _handler_ids.clear()
+    _min_level, _limiter = None, None
+    if not enabled:
+        logger.disable(MAIN_MODULE)
+        return False
+
+    def ava_record(record) -> bool:
+        # records of `ava` modules, and every `file_event` whoever calls it
+        return (record["name"] or "").partition(".")[0] == MAIN_MODULE or "event" in record["extra"]
+
+    file_level = (app.log_level or "INFO").upper()
+    stderr_level = (app.log_stderr_level or "WARNING").upper()
+    levels = [LEVELS.get(stderr_level, 30)]
+    _handler_ids.append(logger.add(sys.stderr, level=stderr_level, filter=ava_record, enqueue=True))
+    if app.log_file:
+        _handler_ids.append(logger.add(
+            JsonlSink(Path(config_path) / app.log_file),
+            level=file_level,
+            format="{message}",
+            filter=ava_record,
+            enqueue=True,
+            catch=True,
+        ))
+        levels.append(LEVELS.get(file_level, 20))
+    _min_level = min(levels)
+    _limiter = RateLimiter(app.log_rate) if app.log_rate else None
+    _logger = logger
+    logger.enable(MAIN_MODULE)
+    return True
+
+
+def enabled(level: str = "DEBUG") -> bool:
+    """ Whether a message at `level` reaches any sink (a flag check when logging is off) """
+    return _min_level is not None and LEVELS[level] >= _min_level
+
+
+def file_event(event: str, path, level: str = "DEBUG", **fields):
+    """
+    Log a per-file event (archive extracted, file found) with its fields
+    bound for the JSON sink. Filtered by level first and, below WARNING,
+    rate limited by `app.log_rate`, so it can stay in per-file loops.
+    """
+    if _min_level is None or LEVELS[level] < _min_level:
+        return
+    if _limiter is not None and LEVELS[level] < LEVELS["WARNING"]:
+        suppressed = _limiter.allow()
+        if suppressed is None:
+            return
+        if suppressed:
+            fields["suppressed"] = suppressed
+    _logger.opt(depth=1).bind(event=event, path=os.fspath(path), **fields).log(level, "{} {}", event, path)
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import zlib
+from pathlib import Path
+
+MANIFEST_FILENAME = "unzip_manifest.jsonl"
+CRC_CHUNK = 1024 * 1024
+
+
+def archive_crc(archive: Path) -> int:
+    """ CRC32 of the whole archive file, read in chunks """
+    crc = 0
+    with open(archive, 'rb') as f:
+        while chunk := f.read(CRC_CHUNK):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+class ExtractManifest:
+    """
+    Append-only JSON-lines record of extracted archives.
+
+    Each line holds the archive path, size, mtime (and optionally a CRC32)
+    plus the files it produced; the last line for an archive wins. A line
+    with `"removed": true` forgets an archive.
+    """
+    def __init__(self, path: Path, checksum: bool = False):
+        self.path = Path(path)
+        self.checksum = checksum
+        self.entries: dict[str, dict] = {}
+        self._lines = 0
+        self.load()
+
+    def load(self):
+        self.entries.clear()
+        self._lines = 0
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # a torn last line from an interrupted run
+                    continue
+                self._lines += 1
+                if entry.get("removed"):
+                    self.entries.pop(entry["archive"], None)
+                else:
+                    self.entries[entry["archive"]] = entry
+
+    @staticmethod
+    def key(archive: Path) -> str:
+        return str(Path(archive).absolute())
+
+    def is_current(self, archive: Path) -> bool:
+        """ True when the archive was already extracted and did not change since """
+        entry = self.entries.get(self.key(archive))
+        if entry is None:
+            return False
+        try:
+            st = os.stat(archive)
+        except OSError:
+            return False
+        if entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns:
+            return False
+        if self.checksum and entry.get("crc") is not None:
+            return entry["crc"] == archive_crc(archive)
+        return True
+
+    def record(self, archive: Path, dest: Path, outputs: list[str]):
+        st = os.stat(archive)
+        entry = {
+            "archive": self.key(archive),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "crc": archive_crc(archive) if self.checksum else None,
+            "dest": str(Path(dest).absolute()),
+            "outputs": outputs,
+            "extracted_at": time.time(),
+        }
+        self.entries[entry["archive"]] = entry
+        self._append(entry)
+
+    def forget(self, key: str):
+        self.entries.pop(key, None)
+        self._append({"archive": key, "removed": True})
+
+    def _append(self, entry: dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a', encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._lines += 1
+
+    def missing(self, folder: Path) -> list[dict]:
+        """ Entries under `folder` whose source archive no longer exists """
+        root = Path(folder).absolute()
+        return [
+            entry for key, entry in self.entries.items()
+            if Path(key).is_relative_to(root) and not os.path.exists(key)
+        ]
+
+    def prune(self, entry: dict) -> int:
+        """
+        Delete the outputs of a vanished archive (unless another archive
+        still claims them) and forget it. Returns the number of removed files.
+        """
+        dest = Path(entry["dest"])
+        claimed = {
+            (other["dest"], name)
+            for key, other in self.entries.items() if key != entry["archive"]
+            for name in other.get("outputs", [])
+        }
+        removed = 0
+        parents = set()
+        for name in entry.get("outputs", []):
+            if (entry["dest"], name) in claimed:
+                continue
+            target = dest / name
+            try:
+                target.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            parents.update(p for p in target.parents if p.is_relative_to(dest) and p != dest)
+        # drop the folders the archive created, deepest first, if now empty
+        for folder in sorted(parents, key=lambda p: len(p.parts), reverse=True):
+            try:
+                folder.rmdir()
+            except OSError:
+                pass
+        self.forget(entry["archive"])
+        return removed
+
+    def compact(self):
+        """ Rewrite the log with one line per live archive """
+        if self._lines <= 2 * max(len(self.entries), 1):
+            return
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + "\n")
+        os.replace(tmp, self.path)
+        self._lines = len(self.entries)
@@ -0,0 +1,59 @@
+import os
+import sys
+import csv
+import json
+from enum import Enum
+from pathlib import Path
+from typing import Iterable
+
+
+class OutputFormat(str, Enum):
+    rich = "rich"
+    ndjson = "ndjson"
+    csv = "csv"
+    null0 = "null0"
+
+
+def write_paths(paths: Iterable[Path], fmt: OutputFormat = OutputFormat.rich) -> int:
+    """
+    Print search results, returns how many were written.
+
+    `rich` pretty-prints the collected list and its length. The machine
+    formats write each path as soon as it is produced, without rich:
+    `ndjson` ({"path": ...} per line, for jq), `csv` (a `path` column) and
+    `null0` (NUL separated, for `xargs -0`). Every record is flushed, so a
+    pipe reader sees it even when the next one takes a long walk to find.
+    """
+    if fmt == OutputFormat.rich:
+        from rich import print
+        files = list(paths)
+        print(files)
+        print(len(files))
+        return len(files)
+
+    out = sys.stdout.buffer
+    count = 0
+    writer = None
+    if fmt == OutputFormat.csv:
+        import io
+        text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+        writer = csv.writer(text)
+        writer.writerow(["path"])
+    try:
+        for path in paths:
+            if fmt == OutputFormat.null0:
+                out.write(os.fsencode(path) + b"\0")
+            elif fmt == OutputFormat.ndjson:
+                out.write(json.dumps({"path": os.fspath(path)}).encode() + b"\n")
+            else:
+                writer.writerow([os.fspath(path)])
+            count += 1
+            out.flush()
+    except BrokenPipeError:
+        # the reader (head, xargs) went away: stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    finally:
+        if writer is not None:
+            text.detach()
+    return count
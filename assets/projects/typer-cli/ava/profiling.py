@@ -0,0 +1,126 @@
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+
+class Timings:
+    """
+    Lightweight span timer: call count and total seconds per phase.
+
+    Disabled by default; `span` and `iter` then cost a flag check, so they
+    can stay in hot paths (per archive, per walk) for good.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.spans: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, elapsed: float, count: int = 1):
+        with self._lock:
+            entry = self.spans.setdefault(name, [0, 0.0])
+            entry[0] += count
+            entry[1] += elapsed
+
+    @contextmanager
+    def span(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def iter(self, name: str, iterable: Iterable) -> Iterator:
+        """ Time spent producing the items of a lazy iterable (e.g. a walk) """
+        if not self.enabled:
+            yield from iterable
+            return
+        it = iter(iterable)
+        elapsed, count = 0.0, 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                count += 1
+                yield item
+        finally:
+            self.add(name, elapsed, count)
+
+    def table(self, total: float):
+        from rich.table import Table
+        table = Table(title=f"ava timings ({total:.3f}s)")
+        table.add_column("phase", style="bold cyan")
+        table.add_column("count", justify="right")
+        table.add_column("seconds", justify="right")
+        table.add_column("%", style="green3", justify="right")
+        for name, (count, elapsed) in sorted(self.spans.items(), key=lambda kv: -kv[1][1]):
+            share = elapsed / total * 100 if total > 0 else 0
+            table.add_row(name, f"{count}", f"{elapsed:.4f}", f"{share:.1f}")
+        return table
+
+    def to_dict(self, total: float) -> dict:
+        return {
+            "total": total,
+            "spans": [
+                {"name": name, "count": count, "seconds": elapsed}
+                for name, (count, elapsed) in sorted(self.spans.items(), key=lambda kv: -kv[1][1])
+            ],
+        }
+
+
+timings = Timings()
+span = timings.span
+
+
+def run_profiled(fn: Callable, show_timings: bool = False, profile: Path = None):
+    """
+    Run `fn` (a command) recording spans, and optionally under cProfile.
+
+    `profile` ending in `.json` gets the spans as a JSON trace; any other
+    name gets a cProfile dump (open with `python -m pstats` or snakeviz).
+    Reports go to stderr so command output stays pipeable.
+
+    Since Python 3.12 cProfile hooks `sys.monitoring`, which is
+    interpreter wide: the one profiler also records the extraction and
+    walk worker threads (a second, per-thread profiler cannot be enabled
+    alongside it). Calls of threads running at the same time share its
+    call stack, so cumulative times of concurrent workers are approximate;
+    the `.json` spans are timed per call and stay exact.
+    """
+    from rich.console import Console
+    console = Console(stderr=True)
+    profiler = None
+    if profile is not None and profile.suffix != ".json":
+        import cProfile
+        profiler = cProfile.Profile()
+    timings.enabled = True
+    start = time.perf_counter()
+    profiler and profiler.enable()
+    try:
+        return fn()
+    finally:
+        profiler and profiler.disable()
+        total = time.perf_counter() - start
+        timings.enabled = False
+        if show_timings:
+            console.print(timings.table(total))
+        if profile is not None and profiler is None:
+            profile.write_text(json.dumps(timings.to_dict(total), indent=2))
+            console.print(f"timings trace: {profile}")
+        elif profiler is not None:
+            import pstats
+            profiler.dump_stats(profile)
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(20)
+            console.print(f"profile: {profile}")
@@ -0,0 +1,123 @@
+import re
+from functools import cache
+from typing import Any
+from pydantic import BaseModel
+
+GLOB_CHARS = frozenset("*?[")
+
+
+def glob_regex(pattern: str) -> re.Pattern:
+    """
+    Dotted-path glob: `*` and `?` stay within one segment, `**` spans
+    segments (`resources.*.path`, `app.**`)
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append(r"[^.]*")
+        elif c == "?":
+            out.append(r"[^.]")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                cls = pattern[i + 1:end].replace("\\", "\\\\")
+                out.append(f"[^{cls[1:]}]" if cls.startswith("!") else f"[{cls}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+class SettingsIndex:
+    """
+    Flattened, read-only view of a settings tree keyed by dotted path.
+
+    The tree (models, computed fields included, and dicts) is walked once;
+    `get` is then a dict lookup, `keys` lists the children of a node and
+    `glob` matches paths. Leaves are the values that are not a model or a
+    dict, so `resources.data.path.name` is simply not found.
+    """
+    def __init__(self, root: BaseModel):
+        self.leaves: dict[str, Any] = {}
+        self.nodes: dict[str, list[str]] = {"": []}
+        self._walk(root, "")
+
+    def _walk(self, node, prefix: str):
+        if isinstance(node, BaseModel):
+            cls = type(node)
+            items = [(name, getattr(node, name)) for name in (*cls.model_fields, *cls.model_computed_fields)]
+        else:
+            items = [(str(name), value) for name, value in node.items()]
+        children = self.nodes[prefix]
+        for name, value in items:
+            path = f"{prefix}.{name}" if prefix else name
+            children.append(name)
+            if isinstance(value, (BaseModel, dict)):
+                self.nodes[path] = []
+                self._walk(value, path)
+            else:
+                self.leaves[path] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.leaves or key in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.leaves)
+
+    def is_node(self, key: str) -> bool:
+        return key in self.nodes
+
+    def get(self, key: str, default=None):
+        """ Leaf value, or the subtree of a node as a dict """
+        if key in self.leaves:
+            return self.leaves[key]
+        if key in self.nodes:
+            return self.to_dict(key)
+        return default
+
+    def keys(self, prefix: str = "") -> list[str]:
+        """ Child names of a node (KeyError for a leaf or a missing path) """
+        return list(self.nodes[prefix])
+
+    def to_dict(self, prefix: str = "") -> dict:
+        base = f"{prefix}." if prefix else ""
+        data = {}
+        for name in self.nodes[prefix]:
+            path = base + name
+            data[name] = self.to_dict(path) if path in self.nodes else self.leaves[path]
+        return data
+
+    def glob(self, pattern: str) -> dict[str, Any]:
+        """ Leaves and nodes whose dotted path matches `pattern` """
+        regex = glob_regex(pattern)
+        return {
+            path: self.get(path)
+            for path in (*self.leaves, *self.nodes)
+            if path and regex.match(path)
+        }
+
+    def query(self, key: str):
+        """ `glob` when `key` has wildcards, `get` otherwise """
+        if GLOB_CHARS.intersection(key):
+            return self.glob(key)
+        return self.get(key)
+
+
+def get_settings_index(use_cache: bool = True) -> SettingsIndex:
+    """ Index of `get_settings()`, built once per process """
+    return _get_settings_index(bool(use_cache))
+
+
+@cache
+def _get_settings_index(use_cache: bool) -> SettingsIndex:
+    from ava.config import get_settings
+    return SettingsIndex(get_settings(use_cache=use_cache))
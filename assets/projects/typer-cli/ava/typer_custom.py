@@ -1,9 +1,61 @@
+from pathlib import Path
+from importlib import import_module
+import click
 from typer.core import TyperGroup
 
+# global options of the root group, see `get_params`
+PROFILE_OPTIONS = [
+    click.Option(
+        ["--timings"], is_flag=True, default=False,
+        help="Print time spent per phase (settings, walk, extraction, output) to stderr.",
+    ),
+    click.Option(
+        ["--profile"], type=click.Path(dir_okay=False, path_type=Path), default=None,
+        help=(
+            "Run under cProfile and save to FILE (.prof), or save phase timings as JSON (.json). "
+            "cProfile sees worker threads too, but their calls interleave with --jobs > 1: "
+            "use the .json timings (per phase, thread safe) to compare phases."
+        ),
+    ),
+]
+
+
 class CustomTyperGroup(TyperGroup):
+    # command groups imported on first use: name -> "module:attribute"
+    lazy_groups: dict[str, str] = {}
+
+    @classmethod
+    def with_lazy_groups(cls, groups: dict[str, str]) -> type["CustomTyperGroup"]:
+        """ Group class resolving `groups` (sub-apps) only when invoked """
+        return type(cls.__name__, (cls,), {"lazy_groups": groups})
+
+    def get_params(self, ctx):
+        params = super().get_params(ctx)
+        if ctx.parent is None:
+            params = params[:-1] + PROFILE_OPTIONS + params[-1:]  # keep --help last
+        return params
+
+    def invoke(self, ctx):
+        show_timings = ctx.params.pop("timings", False)
+        profile = ctx.params.pop("profile", None)
+        if not (show_timings or profile):
+            return super().invoke(ctx)
+        from ava.profiling import run_profiled
+        return run_profiled(lambda: super(CustomTyperGroup, self).invoke(ctx), show_timings, profile)
+
     def list_commands(self, ctx):
         """ Alphabetic sort commands """
-        return sorted(list(self.commands))
+        return sorted(set(self.commands) | set(self.lazy_groups))
         
     def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_groups:
+            self.add_command(self._load_group(cmd_name), cmd_name)
         return super().get_command(ctx, cmd_name)
+
+    def _load_group(self, name: str):
+        import typer
+        module_name, attr = self.lazy_groups[name].split(":")
+        sub_app = getattr(import_module(module_name), attr)
+        group = typer.main.get_command(sub_app)
+        group.name = name
+        return group
@@ -1,32 +1,206 @@
 import os
+import re
+import sys
 import fnmatch
 import inspect
 import functools
 from pathlib import Path
-import rich
-from rich import print
+from typing import Iterator
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from ava.content import ContentMatcher, content_keywords
+from ava.profiling import timings
+from ava.log import file_event
+
+
+# AVA_DEBUG_FUNC=0 turns `debug_func` into a no-op returning the function as is
+DEBUG_FUNC_ENABLED = os.environ.get("AVA_DEBUG_FUNC", "1").lower() not in ("0", "false", "no", "")
+
+
+def _print_call(func, sig: inspect.Signature, args: tuple, kwargs: dict):
+    from rich import print
+    bound_args = sig.bind(*args, **kwargs)
+    bound_args.apply_defaults()  # Fill in default values for missing arguments.
+    print("-"*60)
+    full_name = f"{func.__module__}.[red b]{func.__qualname__}[/]"
+    print(f"{full_name} (*args)")
+    print(bound_args.arguments)
+    print("-"*60)
 
 
 def debug_func(func):
     """ 
     Decorator to debug function arguments 
+
+    The signature is inspected once: with `verbose` off a call is one
+    check of that argument before the undecorated call. What remains is
+    mostly the wrapper frame, 200-350 ns per call (0.3% of `search_files`
+    on a tiny tree, see benchmarks.bench_debug_func); AVA_DEBUG_FUNC=0
+    removes it.
     """
+    if not DEBUG_FUNC_ENABLED:
+        return func
+    sig = inspect.signature(func)
+    param = sig.parameters.get('verbose')
+    if param is None:
+        return func
+    # keyword-only `verbose` is never found in args
+    position = sys.maxsize
+    if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+        position = list(sig.parameters).index('verbose')
+    default = None if param.default is param.empty else param.default
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        # Get the function's signature and bind the passed arguments.
-        sig = inspect.signature(func)
-        bound_args = sig.bind(*args, **kwargs)
-        bound_args.apply_defaults()  # Fill in default values for missing arguments.
-        is_verbose = bound_args.arguments.get('verbose', None)
-        if is_verbose:
-            print("-"*60)
-            full_name = f"{func.__module__}.[red b]{func.__qualname__}[/]"
-            print(f"{full_name} (*args)")
-            print(bound_args.arguments)
-            print("-"*60)
+        # most calls pass neither keywords nor `verbose` by position
+        if (kwargs or len(args) > position or default) and (
+                args[position] if len(args) > position else kwargs.get('verbose', default)):
+            _print_call(func, sig, args, kwargs)
         return func(*args, **kwargs)
     return wrapper
 
+
+def compile_patterns(patterns: list[str]) -> re.Pattern:
+    """
+    Compile glob patterns into a single regex
+    """
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
+def _scan_dir(
+        top: str,
+        match,
+        ignore_parts: set,
+        ignore_extensions: set,
+    ) -> tuple[list[str], list[str]]:
+    """
+    List one folder: matching file paths and subfolders to descend into
+    """
+    files, subdirs = [], []
+    try:
+        with os.scandir(top) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return files, subdirs
+    for entry in entries:
+        name = entry.name
+        if name in ignore_parts:
+            continue
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            # like os.walk: list symlinked folders but do not follow them
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+            continue
+        if not match(name):
+            continue
+        if ignore_extensions and os.path.splitext(name)[1] in ignore_extensions:
+            continue
+        files.append(entry.path)
+    return files, subdirs
+
+
+def _walk_serial(root: str, scan) -> Iterator[str]:
+    stack = [root]
+    while stack:
+        files, subdirs = scan(stack.pop())
+        yield from files
+        # depth-first, keeping name order
+        stack.extend(reversed(subdirs))
+
+
+def _walk_parallel(root: str, scan, workers: int) -> Iterator[str]:
+    """ Fan folders out to a thread pool, yielding files as folders complete """
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = {pool.submit(scan, root)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                pending.update(pool.submit(scan, d) for d in subdirs)
+                yield from files
+    finally:
+        # also reached when the consumer stops early (max_files)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_files(
+        folderpath: Path,
+        extensions: list = ['*'],
+        ignore_extensions: list = None,
+        ignore_parts: list[str] = None,
+        keywords: str | list[str] = None,
+        max_files: int = 0,
+        workers: int = 0,
+        regex: str = None,
+        max_size: int = 0,
+    ) -> Iterator[Path]:
+    """
+    Lazily yield files matching the criterias while walking the folder
+
+    Directories named in `ignore_parts` are pruned before descending, entries
+    are visited in name order and the walk stops once `max_files` are found.
+    With `workers > 1` folders are listed on a thread pool and files are
+    yielded in completion order. `keywords` (any of) or `regex` filter on
+    file contents, skipping binaries and files above `max_size` bytes.
+    """
+    ignore_extensions = set(ignore_extensions or [])
+    ignore_parts = set(ignore_parts or [])
+    if ignore_parts.intersection(Path(folderpath).parts):
+        return
+    scan = functools.partial(
+        _scan_dir,
+        match=compile_patterns(extensions).match,
+        ignore_parts=ignore_parts,
+        ignore_extensions=ignore_extensions,
+    )
+    root = os.fspath(folderpath)
+    walk = _walk_parallel(root, scan, workers) if workers > 1 else _walk_serial(root, scan)
+    walk = timings.iter("search_files walk", walk)
+    paths = walk
+    keywords = content_keywords(keywords)
+    if keywords or regex:
+        matcher = ContentMatcher(keywords=keywords, regex=regex, max_size=max_size)
+        paths = matcher.filter(walk, workers=workers)
+    try:
+        for found, path in enumerate(paths, 1):
+            file_event("found", path)
+            yield Path(path)
+            if max_files > 0 and found >= max_files:
+                return
+    finally:
+        paths.close()
+        walk.close()
+
+
+def _search_index(
+        folderpath: Path,
+        keywords: str | list[str] = None,
+        max_files: int = 0,
+        workers: int = 0,
+        regex: str = None,
+        max_size: int = 0,
+        **criterias,
+    ) -> Iterator[Path]:
+    from ava.index import FileIndex
+    with FileIndex(folderpath) as index:
+        index.refresh()
+        keywords = content_keywords(keywords)
+        content = keywords or regex
+        paths = index.query(max_files=0 if content else max_files, **criterias)
+        if content:
+            matcher = ContentMatcher(keywords=keywords, regex=regex, max_size=max_size)
+            paths = matcher.filter(paths, workers=workers)
+        for found, path in enumerate(paths, 1):
+            file_event("found", path)
+            yield Path(path)
+            if max_files > 0 and found >= max_files:
+                return
+
+
 @debug_func
 def search_files(
         folderpath: Path, 
@@ -34,39 +208,58 @@ def search_files(
         ignore_extensions: list = None,
         max_files: int = 0,
         ignore_parts: list[str] = [],
-        keywords: str = None,
+        keywords: str | list[str] = None,
         sort_files: bool = True,
+        stream: bool = False,
+        workers: int = 0,
+        regex: str = None,
+        max_size: int = 0,
+        use_index: bool = False,
         verbose: bool = None
-    ) -> list[Path]:
+    ) -> list[Path] | Iterator[Path]:
     """
     Search in filesystem given a folder and criterias
+
+    With `stream=True` a lazy iterator is returned instead of a list.
+    `max_files` stops the walk early: the first files in walk order
+    are kept, then sorted. `workers` walks folders on a thread pool.
+    `use_index` answers from the folder's file index (see `ava index`),
+    refreshed incrementally first, instead of walking the tree.
     """
-    ignore_extensions = ignore_extensions or []
-    ignore_parts = ignore_parts or []
-    files = []
-    for root, _, filenames in os.walk(folderpath):
-        for ext in extensions:
-            for filename in fnmatch.filter(filenames, ext):
-                fp = Path(os.path.join(root, filename))
-                if len(ignore_extensions) > 0 and fp.suffix in ignore_extensions: 
-                    continue
-                if any(part in fp.parts for part in ignore_parts):
-                    continue
-                if keywords:
-                    # Read the file's text content. Again, errors='ignore' helps avoid encoding issues.
-                    content = fp.read_text(encoding='utf-8', errors='ignore')
-                    if keywords not in content:
-                        # print(f"Found keyword in: {fp}")
-                        continue
-                files.append(fp)
+    if use_index:
+        files = _search_index(
+            folderpath,
+            extensions=extensions,
+            ignore_extensions=ignore_extensions,
+            ignore_parts=ignore_parts,
+            keywords=keywords,
+            max_files=max_files,
+            sort_files=sort_files,
+            workers=workers,
+            regex=regex,
+            max_size=max_size,
+        )
+        return files if stream else list(files)
+
+    files = iter_files(
+        folderpath,
+        extensions=extensions,
+        ignore_extensions=ignore_extensions,
+        ignore_parts=ignore_parts,
+        keywords=keywords,
+        max_files=max_files,
+        workers=workers,
+        regex=regex,
+        max_size=max_size,
+    )
+    if stream:
+        return files
     
     # sort the list of Path objects
-    files = sorted(files, key=lambda f: str(f)) if sort_files else files
-
-    if max_files > 0 and len(files) > max_files:
-        files = files[:max_files]
+    files = sorted(files, key=lambda f: str(f)) if sort_files else list(files)
     
     if verbose:
+        from rich import print
         print(locals())
         print(f"found={len(files)}")
         
@@ -80,6 +273,8 @@ def debug_cli(app,
     """ 
     Show all commands, groups and subcommands in the CLI app
     """
+    import rich.table
+    from rich import print
     FMT_OPTS = ['table','json','text']
     SEP = 60
     CMD_SEP = " --- "
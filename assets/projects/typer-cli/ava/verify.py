@@ -0,0 +1,140 @@
+import os
+import time
+import shutil
+import tarfile
+import zipfile
+import multiprocessing
+from pathlib import Path
+from collections import deque
+from dataclasses import dataclass, asdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
+from ava.extractors import DECOMPRESS_ERRORS, ExtractError, open_extractor
+
+# what a damaged archive raises while being listed or read
+ARCHIVE_ERRORS = (ExtractError, zipfile.BadZipFile, tarfile.TarError, OSError, EOFError, ValueError, *DECOMPRESS_ERRORS)
+
+
+@dataclass
+class ArchiveReport:
+    archive: str
+    format: str | None = None
+    members: int = 0
+    files: int = 0
+    size: int = 0
+    compressed: int | None = None
+    largest: str | None = None
+    largest_size: int = 0
+    ok: bool = True
+    error: str | None = None
+    checked: bool = False
+    quarantined: str | None = None
+    seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def list_archive(archive: str | Path) -> ArchiveReport:
+    """
+    Member count, total size and largest member of an archive, without
+    extracting it. Zip archives only read their central directory; tar
+    streams have none and are read through.
+    """
+    report = ArchiveReport(str(archive))
+    start = time.perf_counter()
+    try:
+        extractor = open_extractor(archive)
+        report.format = extractor.name
+        members = extractor.members()
+        report.members = len(members)
+        files = [m for m in members if not m.is_dir]
+        report.files = len(files)
+        report.size = sum(m.size or 0 for m in files)
+        if all(m.compressed is not None for m in files):
+            report.compressed = sum(m.compressed for m in files)
+        if files:
+            largest = max(files, key=lambda m: m.size or 0)
+            report.largest, report.largest_size = largest.name, largest.size or 0
+    except ARCHIVE_ERRORS as e:
+        report.ok = False
+        report.error = f"{type(e).__name__}: {e}"
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def verify_archive(archive: str | Path) -> ArchiveReport:
+    """ `list_archive` plus a full read checking every member's CRC """
+    report = list_archive(archive)
+    if not report.ok:
+        return report
+    start = time.perf_counter()
+    try:
+        open_extractor(archive).verify()
+        report.checked = True
+    except ARCHIVE_ERRORS as e:
+        report.ok = False
+        report.error = f"{type(e).__name__}: {e}"
+    report.seconds += time.perf_counter() - start
+    return report
+
+
+def quarantine(report: ArchiveReport, folder: Path, root: Path = None) -> Path | None:
+    """
+    Move a corrupt archive under `folder`, keeping its path relative to
+    `root`. A move that fails (permissions, an archive already quarantined
+    there) is added to `report.error` and leaves `quarantined` unset.
+    """
+    archive = Path(report.archive)
+    try:
+        relative = archive.resolve().relative_to(Path(root).resolve()) if root else Path(archive.name)
+    except ValueError:
+        relative = Path(archive.name)
+    target = Path(folder) / relative
+    try:
+        if target.exists():
+            raise FileExistsError(f"{target} already exists")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(archive, target)
+    except OSError as e:
+        report.quarantined = None
+        report.error = f"{report.error}; not quarantined: {type(e).__name__}: {e}"
+        return None
+    report.quarantined = str(target)
+    return target
+
+
+def _executor(jobs: int, processes: bool) -> Executor:
+    if processes:
+        # spawn: the walk feeding the pool may run threads, fork would copy them
+        return ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=jobs)
+
+
+def check_archives(
+        archives: Iterable[Path],
+        check: Callable[[str], ArchiveReport] = verify_archive,
+        jobs: int = 0,
+        processes: bool = True,
+    ) -> Iterator[ArchiveReport]:
+    """
+    Run `check` (`verify_archive` or `list_archive`) over archives and
+    yield the reports in input order.
+
+    CRC checks are CPU bound: `processes` runs them on a process pool
+    (`jobs` workers, one per cpu by default) while the archives are still
+    being found, keeping a bounded window of archives in flight.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs <= 1:
+        for archive in archives:
+            yield check(os.fspath(archive))
+        return
+    window = deque()
+    with _executor(jobs, processes) as pool:
+        for archive in archives:
+            window.append(pool.submit(check, os.fspath(archive)))
+            if len(window) >= jobs * 4:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
@@ -0,0 +1,256 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+from typing import Callable, Iterator
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ONLYDIR
+EVENT = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+
+def _libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        libc.inotify_init1
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class InotifySource:
+    """
+    Recursive inotify watch over a folder tree (Linux, through ctypes).
+
+    `changes(timeout)` blocks in `select` until events arrive, so an idle
+    watch costs no CPU. Files are reported when closed after writing or
+    moved in; new folders are watched and listed (files may land before
+    the watch is in place). A queue overflow reports every file again.
+    """
+    def __init__(self, root: Path, skip: Callable[[str], bool]):
+        self.libc = _libc()
+        if self.libc is None or not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = os.fspath(root)
+        self.skip = skip
+        self.dirs: dict[int, str] = {}
+        self._pending_files: list[str] = []
+        self.add_tree(self.root, report=False)
+
+    def close(self):
+        os.close(self.fd)
+
+    def add_tree(self, top: str, report: bool = True):
+        """ Watch `top` and its subfolders, optionally reporting the files found """
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            if self.skip(path):
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                continue
+            self.dirs[wd] = path
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif report:
+                            self._pending_files.append(entry.path)
+            except OSError:
+                pass
+
+    def changes(self, timeout: float) -> list[str]:
+        files, self._pending_files = self._pending_files, []
+        if files:
+            timeout = 0
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return files
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return files
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b"\0")
+            offset += EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                self.add_tree(self.root)
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            parent = self.dirs.get(wd)
+            if parent is None or not name:
+                continue
+            path = os.path.join(parent, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(path)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                files.append(path)
+        # files found in folders created meanwhile
+        found, self._pending_files = self._pending_files, []
+        return files + found
+
+
+class PollSource:
+    """
+    Portable fallback: re-list the tree every `interval` seconds and report
+    files that are new or whose size/mtime changed since the last listing.
+    """
+    def __init__(self, root: Path, skip: Callable[[str], bool], interval: float = 5.0):
+        self.root = os.fspath(root)
+        self.skip = skip
+        self.interval = interval
+        self.snapshot = self._list()
+        self.next_poll = time.monotonic() + interval
+
+    def close(self):
+        pass
+
+    def _list(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            if self.skip(path):
+                continue
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file():
+                                st = entry.stat()
+                                snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return snapshot
+
+    def changes(self, timeout: float) -> list[str]:
+        wait = self.next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(0.0, wait))
+        self.next_poll = time.monotonic() + self.interval
+        previous, self.snapshot = self.snapshot, self._list()
+        return [path for path, stat in self.snapshot.items() if previous.get(path) != stat]
+
+
+class ArchiveWatcher:
+    """
+    Yield archives appearing under `root` once their upload completed.
+
+    A file is ready when it has not changed for `settle` seconds (size and
+    mtime are checked again, so partial uploads are debounced). Iteration
+    yields `None` on idle ticks so a consumer (`extract_archives`) can
+    report finished work while waiting; it never ends on its own.
+    """
+    def __init__(
+            self,
+            root: Path,
+            match: Callable[[str], object],
+            settle: float = 2.0,
+            poll_interval: float = 5.0,
+            polling: bool = False,
+            ignore_prefix: str = None,
+        ):
+        self.root = Path(root)
+        self.match = match
+        self.settle = settle
+        self.ignore_prefix = ignore_prefix
+        self.candidates: dict[str, tuple[float, int, int]] = {}
+        self.emitted: dict[str, tuple[int, int]] = {}
+        source = None
+        if not polling:
+            try:
+                source = InotifySource(self.root, self._skip_dir)
+            except OSError:
+                source = None
+        self.source = source or PollSource(self.root, self._skip_dir, poll_interval)
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if isinstance(self.source, InotifySource) else "polling"
+
+    def _skip_dir(self, path: str) -> bool:
+        return bool(self.ignore_prefix) and os.path.basename(path).startswith(self.ignore_prefix)
+
+    def close(self):
+        self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _stat(self, path: str) -> tuple[int, int] | None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def __iter__(self) -> Iterator[Path | None]:
+        while True:
+            now = time.monotonic()
+            timeout = self.settle
+            if self.candidates:
+                timeout = max(0.0, min(deadline for deadline, _, _ in self.candidates.values()) - now)
+            for path in self.source.changes(timeout):
+                if not self.match(os.path.basename(path)):
+                    continue
+                if self.ignore_prefix and f"{os.sep}{self.ignore_prefix}" in path:
+                    continue
+                stat = self._stat(path)
+                if stat is not None:
+                    self.candidates[path] = (time.monotonic() + self.settle, *stat)
+
+            ready = []
+            now = time.monotonic()
+            for path, (deadline, size, mtime) in list(self.candidates.items()):
+                if deadline > now:
+                    continue
+                stat = self._stat(path)
+                if stat is None:
+                    del self.candidates[path]
+                elif stat != (size, mtime):
+                    # still being written
+                    self.candidates[path] = (now + self.settle, *stat)
+                else:
+                    del self.candidates[path]
+                    if self.emitted.get(path) != stat:
+                        self.emitted[path] = stat
+                        ready.append(path)
+            for path in sorted(ready):
+                yield Path(path)
+            if not ready:
+                yield None
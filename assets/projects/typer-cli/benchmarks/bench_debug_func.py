@@ -0,0 +1,86 @@
+"""
+Per-call overhead of `debug_func` with verbose off
+
+    python -m benchmarks.bench_debug_func
+
+With verbose off the wrapper costs a fixed 200-350 ns per call, most
+of it the extra Python frame that any wrapper pays (a bare pass-through
+`functools.wraps` wrapper is measured alongside). That is 3-4x a noop but
+well under 1% of real functions like `search_files`. Set AVA_DEBUG_FUNC=0
+to remove the wrapper entirely.
+
+Exits with status 1 when `debug_func` costs more than WRAPPER_SLACK times
+the bare wrapper, or more than SEARCH_BUDGET of a `search_files` call.
+"""
+import sys
+import timeit
+import tempfile
+import functools
+from pathlib import Path
+from rich import print
+from rich.table import Table
+from ava.utils import debug_func, search_files
+from benchmarks.fixtures import make_tree
+
+
+# allowed cost of debug_func relative to a bare wrapper frame
+WRAPPER_SLACK = 2.0
+# allowed share of the fixed overhead in a search_files call
+SEARCH_BUDGET = 0.01
+
+
+def noop(a, b=None, verbose=None):
+    return a
+
+
+@functools.wraps(noop)
+def bare_noop(*args, **kwargs):
+    return noop(*args, **kwargs)
+
+
+def best_ns(callables: list, number: int, repeat: int = 15) -> list[float]:
+    """ best ns/call of each callable, measured interleaved in a rotating order """
+    best = [float("inf")] * len(callables)
+    for r in range(repeat):
+        for i in range(len(callables)):
+            i = (i + r) % len(callables)
+            best[i] = min(best[i], timeit.timeit(callables[i], number=number) / number * 1e9)
+    return best
+
+
+def main():
+    decorated_noop = debug_func(noop)
+    plain, bare, wrapped = best_ns(
+        [lambda: noop(1, 2), lambda: bare_noop(1, 2), lambda: decorated_noop(1, 2)], 200_000,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        make_tree(Path(tmp), depth=1, width=2, files=5)
+        plain_search = getattr(search_files, "__wrapped__", search_files)
+        search, = best_ns([lambda: plain_search(tmp, sort_files=False)], 2_000, repeat=5)
+
+    table = Table(title="debug_func overhead (verbose off)")
+    table.add_column("function", style="bold cyan")
+    table.add_column("plain ns", justify="right")
+    table.add_column("wrapped ns", justify="right")
+    table.add_column("overhead ns", style="green3", justify="right")
+    table.add_column("share", style="green3", justify="right")
+    table.add_row("noop, bare wrapper", f"{plain:.0f}", f"{bare:.0f}", f"{bare - plain:.0f}", f"{(bare - plain) / plain:+.1%}")
+    table.add_row("noop, debug_func", f"{plain:.0f}", f"{wrapped:.0f}", f"{wrapped - plain:.0f}", f"{(wrapped - plain) / plain:+.1%}")
+    # the overhead is a fixed cost per call, so its share of a real function
+    # is computed rather than measured as the difference of two noisy timings
+    table.add_row("search_files (tiny tree)", f"{search:.0f}", f"{search + wrapped - plain:.0f}",
+                  f"{wrapped - plain:.0f}", f"{(wrapped - plain) / search:+.2%}")
+    print(table)
+
+    failures = []
+    if wrapped - plain > (bare - plain) * WRAPPER_SLACK:
+        failures.append(f"debug_func adds {wrapped - plain:.0f} ns, a bare wrapper {bare - plain:.0f} ns")
+    if wrapped - plain > search * SEARCH_BUDGET:
+        failures.append(f"debug_func is {(wrapped - plain) / search:.2%} of a search_files call")
+    for failure in failures:
+        print(f"[red b]over budget:[/] {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Walk speed of search_files: serial vs thread pool workers
+
+    python -m benchmarks.bench_walk
+    python -m benchmarks.bench_walk --depth 5 --width 6 --workers 1 4 8 16
+    python -m benchmarks.bench_walk --latency 2
+
+On a local, page-cached tree listing folders is CPU bound and threads do not
+help; `--latency` adds a per-folder delay to emulate network-mounted storage,
+where the parallel walk pays off.
+"""
+import os
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from rich import print
+from rich.table import Table
+from ava.utils import iter_files
+from benchmarks.fixtures import make_tree
+
+
+def best_of(fn, repeat: int) -> tuple[float, int]:
+    best, count = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--width", type=int, default=6)
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0, help="Extra ms per folder listing")
+    parser.add_argument("--root", type=Path, help="Walk an existing tree instead of a synthetic one")
+    args = parser.parse_args()
+
+    if args.latency:
+        scandir = os.scandir
+        def slow_scandir(path="."):
+            time.sleep(args.latency / 1000)
+            return scandir(path)
+        os.scandir = slow_scandir
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.root
+        if root is None:
+            root = Path(tmp)
+            total = make_tree(root, args.depth, args.width, args.files)
+            print(f"synthetic tree: {total} files in {root}")
+
+        table = Table(title=f"walk {root}")
+        table.add_column("mode", style="bold cyan")
+        table.add_column("files", justify="right")
+        table.add_column("seconds", justify="right")
+        table.add_column("speedup", style="green3", justify="right")
+
+        baseline, count = best_of(lambda: sum(len(f) for _, _, f in os.walk(root)), args.repeat)
+        table.add_row("os.walk", f"{count}", f"{baseline:.3f}", "1.00x")
+        for workers in args.workers:
+            elapsed, count = best_of(
+                lambda: sum(1 for _ in iter_files(root, ignore_parts=["node_modules"], workers=workers)),
+                args.repeat,
+            )
+            table.add_row(f"workers={workers}", f"{count}", f"{elapsed:.3f}", f"{baseline / elapsed:.2f}x")
+        print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Synthetic fixtures for the benchmarks
+"""
+import os
+from pathlib import Path
+
+
+def make_tree(root: Path, depth: int = 4, width: int = 6, files: int = 10) -> int:
+    """
+    Build a deep/wide folder tree: `width` subfolders per level, `depth`
+    levels, `files` small files per folder. Returns the number of files.
+    """
+    total = 0
+    level = [root]
+    for d in range(depth + 1):
+        nxt = []
+        for folder in level:
+            folder.mkdir(parents=True, exist_ok=True)
+            for i in range(files):
+                suffix = ".py" if i % 3 == 0 else ".txt"
+                (folder / f"file{i}{suffix}").write_text(f"content {d} {i}\n")
+                total += 1
+            if d < depth:
+                nxt.extend(folder / f"dir{w}" for w in range(width))
+        level = nxt
+    # a subtree the searches ignore
+    (root / "node_modules" / "pkg").mkdir(parents=True, exist_ok=True)
+    (root / "node_modules" / "pkg" / "index.py").write_text("ignored\n")
+    return total
+
+
+def make_zips(root: Path, count: int = 1000, files: int = 5, size: int = 1024) -> list[Path]:
+    """ Many small zips, `files` members of `size` bytes each, 50 per folder """
+    import zipfile
+    archives = []
+    for i in range(count):
+        archive = root / f"course{i // 50}" / f"submission{i}.zip"
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(archive, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for j in range(files):
+                zf.writestr(f"src/file{j}.txt", os.urandom(size // 2).hex())
+        archives.append(archive)
+    return archives
+
+
+def make_large_zip(path: Path, size_mb: int = 64, members: int = 4) -> Path:
+    """ A few very large members, half random (incompressible), half text """
+    import zipfile
+    chunk = 1024 * 1024
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for m in range(members):
+            with zf.open(f"data/member{m}.bin", 'w', force_zip64=True) as dst:
+                for c in range(size_mb // members):
+                    dst.write(os.urandom(chunk) if c % 2 else b"line of text\n" * (chunk // 13))
+    return path
@@ -0,0 +1,165 @@
+"""
+Benchmark suite of the `ava` hot paths, results written as JSON
+
+    python -m benchmarks.run
+    python -m benchmarks.run --quick --only walk unzip
+    python -m benchmarks.run --compare benchmarks/results/<previous>.json
+"""
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from rich import print
+from rich.table import Table
+from benchmarks.fixtures import make_tree, make_zips, make_large_zip
+
+RESULTS_DIR = Path(__file__).parent / "results"
+GROUPS = ["walk", "unzip", "settings", "debug_func", "startup"]
+
+
+class Suite:
+    """ Collects timings: best and mean of `repeat` runs per case """
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results = []
+
+    def bench(self, name: str, fn, setup=None, repeat: int = None, **info):
+        times = []
+        for _ in range(repeat or self.repeat):
+            setup and setup()
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        self.results.append({
+            "name": name,
+            "best": min(times),
+            "mean": sum(times) / len(times),
+            "runs": len(times),
+            **info,
+        })
+        print(f"[dim]{name}: {min(times):.4f}s")
+
+
+def bench_walk(suite: Suite, tmp: Path, scale: int):
+    from ava.utils import search_files
+    root = tmp / "tree"
+    total = make_tree(root, depth=3 + scale, width=6, files=10)
+    suite.bench("walk/search_files", lambda: search_files(root), files=total)
+    suite.bench("walk/ignore_parts", lambda: search_files(root, ignore_parts=["node_modules", "dir3"]), files=total)
+    suite.bench("walk/extensions", lambda: search_files(root, extensions=["*.py", "*.zip"]), files=total)
+    suite.bench("walk/keywords", lambda: search_files(root, keywords="content 2 3"), files=total)
+    suite.bench("walk/workers=8", lambda: search_files(root, workers=8), files=total)
+
+
+def bench_unzip(suite: Suite, tmp: Path, scale: int):
+    from ava.extract import extract_archives
+    from ava.extractors import ExtractLimits
+    small = make_zips(tmp / "small", count=300 * scale)
+    large = [make_large_zip(tmp / "large" / f"big{i}.zip", size_mb=32 * scale) for i in range(2)]
+    limits = ExtractLimits(max_total_bytes=1 << 40, max_ratio=1000)
+
+    def clean(root: Path):
+        def run():
+            for path in root.rglob("src"):
+                shutil.rmtree(path, ignore_errors=True)
+            for path in root.rglob("data"):
+                shutil.rmtree(path, ignore_errors=True)
+        return run
+
+    for jobs in (1, 4):
+        suite.bench(f"unzip/small jobs={jobs}", lambda: extract_archives(small, jobs=jobs),
+                    setup=clean(tmp / "small"), archives=len(small))
+    suite.bench("unzip/small guarded", lambda: extract_archives(small, jobs=4, limits=limits),
+                setup=clean(tmp / "small"), archives=len(small))
+    suite.bench("unzip/large jobs=2", lambda: extract_archives(large, jobs=2),
+                setup=clean(tmp / "large"), archives=len(large), mb=64 * scale)
+
+
+def bench_settings(suite: Suite, tmp: Path, scale: int):
+    from ava import config
+    config.context.USER_CONFIG_PATH = tmp / "config"
+    suite.bench("settings/ToolSettings()", lambda: [config.ToolSettings() for _ in range(100)], per=100)
+    config.load_settings()
+    suite.bench("settings/load_settings cached", lambda: [config.load_settings() for _ in range(100)], per=100)
+
+
+def bench_debug_func(suite: Suite, tmp: Path, scale: int):
+    from ava.utils import debug_func
+
+    def noop(a, b=None, verbose=None):
+        return a
+    decorated = debug_func(noop)
+    n = 200_000
+    suite.bench("debug_func/plain", lambda: [noop(1, 2) for _ in range(n)], per=n)
+    suite.bench("debug_func/decorated", lambda: [decorated(1, 2) for _ in range(n)], per=n)
+
+
+def bench_startup(suite: Suite, tmp: Path, scale: int):
+    cmd = [sys.executable, "-c", "import sys; sys.argv = ['ava', 'version']; from ava.app_cli import main; main()"]
+    suite.bench("startup/ava version", lambda: subprocess.run(cmd, capture_output=True, check=True))
+
+
+def compare(results: list[dict], previous: Path):
+    before = {r["name"]: r for r in json.loads(previous.read_text())["results"]}
+    table = Table(title=f"compared to {previous.name}")
+    table.add_column("case", style="bold cyan")
+    table.add_column("before", justify="right")
+    table.add_column("now", justify="right")
+    table.add_column("change", justify="right")
+    for r in results:
+        old = before.get(r["name"])
+        if old is None:
+            continue
+        change = (r["best"] - old["best"]) / old["best"]
+        style = "red" if change > 0.1 else "green3" if change < -0.1 else None
+        table.add_row(r["name"], f"{old['best']:.4f}", f"{r['best']:.4f}", f"{change:+.1%}", style=style)
+    print(table)
+
+
+def git_commit() -> str | None:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=GROUPS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="Smaller fixtures")
+    parser.add_argument("--output", type=Path, help="JSON file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, help="Previous JSON results to compare with")
+    args = parser.parse_args()
+
+    scale = 1 if args.quick else 2
+    suite = Suite(repeat=args.repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        for group in args.only:
+            globals()[f"bench_{group}"](suite, Path(tmp) / group, scale)
+
+    now = datetime.now()
+    report = {
+        "meta": {
+            "date": now.isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": scale,
+        },
+        "results": suite.results,
+    }
+    output = args.output or RESULTS_DIR / f"{now:%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"results: [green b]{output}")
+    if args.compare:
+        compare(suite.results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
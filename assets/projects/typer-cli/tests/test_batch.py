@@ -0,0 +1,40 @@
+import json
+import typer
+import pytest
+from ava.app_cli import app
+from ava.batch import parse_entries, run_batch
+
+
+def test_parse_entries():
+    lines = [
+        "# comment",
+        "",
+        "ava search data -e '*.zip'",
+        '["debug", "settings"]',
+        '{"cmd": "version"}',
+        '{"args": ["unzip-all", "data", "--dry"]}',
+    ]
+    entries = list(parse_entries(lines))
+    assert [e.line for e in entries] == [3, 4, 5, 6]
+    assert entries[0].args == ["search", "data", "-e", "*.zip"]
+    assert entries[1].args == ["debug", "settings"]
+    assert entries[2].args == ["version"]
+    assert entries[3].args == ["unzip-all", "data", "--dry"]
+    with pytest.raises(ValueError, match="line 1"):
+        list(parse_entries(['{"cmd": 3}']))
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_run_batch(tmp_path, jobs):
+    for i in range(3):
+        (tmp_path / f"f{i}.txt").write_text("x")
+    lines = [f"search {tmp_path} -e f{i}.txt --format ndjson" for i in range(3)]
+    lines += ["no-such-command", "batch -"]
+    command = typer.main.get_command(app)
+    results = list(run_batch(command, parse_entries(lines), jobs=jobs))
+    assert [r.line for r in results] == [1, 2, 3, 4, 5]
+    for i, r in enumerate(results[:3]):
+        assert r.exit_code == 0
+        assert json.loads(r.output) == {"path": str(tmp_path / f"f{i}.txt")}
+    assert results[3].exit_code == 2
+    assert results[4].exit_code == 2 and "nested" in results[4].error
@@ -0,0 +1,37 @@
+from ava.catalog import Catalog, parse_assign_name
+from ava.utils import iter_files
+
+
+def test_parse_assign_name():
+    assert parse_assign_name("Foz-TADS-DesWeb4-2024-3-Artista-397225.zip") == {
+        "course": "Foz-TADS-DesWeb4-2024", "name": "3-Artista", "id": "397225",
+    }
+    assert parse_assign_name("dir/Web1-2025-1-Intro-7.tar.gz")["name"] == "1-Intro"
+    assert parse_assign_name("readme.zip") is None
+
+
+def test_catalog_ingest_and_find(tmp_path):
+    names = [
+        "a/Foz-TADS-DesWeb4-2024-3-Artista-397225.zip",
+        "a/Foz-TADS-DesWeb4-2024-3-Artista-111.zip",
+        "b/Foz-TADS-Web1-2025-1-Intro-397225.tar.gz",
+        "b/notes.zip",
+    ]
+    for name in names:
+        path = tmp_path / "subs" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+    with Catalog(tmp_path / "catalog.db") as catalog:
+        stats = catalog.ingest(iter_files(tmp_path / "subs", extensions=["*.zip", "*.tar.gz"]))
+        assert (stats.scanned, stats.added, stats.unparsed, stats.courses) == (4, 3, 1, 2)
+        # re-ingesting updates in place
+        catalog.ingest(iter_files(tmp_path / "subs", extensions=["*.zip", "*.tar.gz"]))
+        assert len(list(catalog.find())) == 3
+        assert [r["course"] for r in catalog.find(id="397225")] == ["Foz-TADS-DesWeb4-2024", "Foz-TADS-Web1-2025"]
+        assert {r["id"] for r in catalog.find(course="Foz-TADS-DesWeb4-2024")} == {"111", "397225"}
+        plan = catalog.db.execute("EXPLAIN QUERY PLAN SELECT * FROM assigns WHERE id=?", ("1",)).fetchall()
+        assert "INDEX" in str([tuple(r) for r in plan])
+        catalog.add_assign(id="5", name="4-Final", course="Foz-TADS-DesWeb4-2024")
+        assert catalog.add_course("New-2026") and not catalog.add_course("New-2026")
+        courses = {r["name"]: r["submissions"] for r in catalog.courses()}
+        assert courses == {"Foz-TADS-DesWeb4-2024": 3, "Foz-TADS-Web1-2025": 1, "New-2026": 0}
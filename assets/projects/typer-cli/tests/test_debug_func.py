@@ -0,0 +1,31 @@
+from ava.utils import debug_func
+
+
+def test_debug_func_verbose_lookup(capsys):
+    @debug_func
+    def add(a, b=1, verbose=None):
+        return a + b
+
+    assert add(1) == 2
+    assert capsys.readouterr().out == ""
+    assert add(1, 2, True) == 3
+    assert "add" in capsys.readouterr().out
+    assert add(1, verbose=True) == 2
+    assert "'verbose': True" in capsys.readouterr().out
+
+
+def test_debug_func_without_verbose_is_identity():
+    def plain(a):
+        return a
+    assert debug_func(plain) is plain
+
+
+def test_debug_func_verbose_default_on(capsys):
+    @debug_func
+    def shout(a, verbose=True):
+        return a
+
+    assert shout(1) == 1
+    assert "shout" in capsys.readouterr().out
+    assert shout(1, verbose=False) == 1
+    assert capsys.readouterr().out == ""
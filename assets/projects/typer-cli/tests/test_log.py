@@ -0,0 +1,55 @@
+import json
+from types import SimpleNamespace
+from ava import log
+
+
+def app_settings(**values):
+    defaults = dict(
+        logger_enabled=True, log_level="DEBUG", log_stderr_level="CRITICAL",
+        log_file="ava.log.jsonl", log_rate=3,
+    )
+    return SimpleNamespace(**{**defaults, **values})
+
+
+def test_file_events_are_rate_limited(tmp_path):
+    try:
+        assert log.setup_logging(app_settings(), tmp_path)
+        for i in range(10):
+            log.file_event("found", tmp_path / f"{i}.zip")
+        log.file_event("failed", tmp_path / "bad.zip", level="ERROR", error="bad CRC")
+        log._logger.complete()
+        # removing the handlers drains the queue and closes the file
+        log.setup_logging(app_settings(logger_enabled=False), tmp_path)
+        entries = [json.loads(line) for line in (tmp_path / "ava.log.jsonl").read_text().splitlines()]
+    finally:
+        log.setup_logging(app_settings(logger_enabled=False), tmp_path)
+
+    # a burst of `log_rate` events, errors are never dropped
+    assert [e["event"] for e in entries] == ["found"] * 3 + ["failed"]
+    assert entries[0]["path"] == str(tmp_path / "0.zip")
+    assert entries[-1]["level"] == "ERROR" and entries[-1]["error"] == "bad CRC"
+
+
+def test_disabled_logging_is_a_flag_check(tmp_path):
+    assert not log.setup_logging(app_settings(logger_enabled=False), tmp_path)
+    assert not log.enabled("CRITICAL")
+    log.file_event("found", tmp_path / "a.zip")
+    assert not (tmp_path / "ava.log.jsonl").exists()
+
+
+def test_setup_logging_keeps_host_sinks(tmp_path):
+    from loguru import logger
+    host = []
+    host_id = logger.add(host.append, format="{message}")
+    try:
+        log.setup_logging(app_settings(), tmp_path)
+        log.setup_logging(app_settings(), tmp_path)
+        logger.info("host message")
+        log.setup_logging(app_settings(logger_enabled=False), tmp_path)
+        logger.info("still there")
+        assert log._handler_ids == []
+    finally:
+        logger.remove(host_id)
+    assert [m.strip() for m in host] == ["host message", "still there"]
+    # ava sinks only take `ava` records
+    assert (tmp_path / "ava.log.jsonl").read_text() == ""
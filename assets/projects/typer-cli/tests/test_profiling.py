@@ -0,0 +1,49 @@
+import json
+from typer.testing import CliRunner
+from ava.profiling import Timings
+from ava.app_cli import app
+
+
+def test_timings_disabled_records_nothing():
+    timings = Timings()
+    with timings.span("a"):
+        pass
+    assert list(timings.iter("walk", [1, 2])) == [1, 2]
+    assert timings.spans == {}
+
+
+def test_timings_spans_and_iter():
+    timings = Timings()
+    timings.enabled = True
+    with timings.span("a"):
+        pass
+    with timings.span("a"):
+        pass
+    assert list(timings.iter("walk", range(3))) == [0, 1, 2]
+    assert timings.spans["a"][0] == 2
+    assert timings.spans["walk"][0] == 3
+
+
+def test_profile_option_writes_json_trace(tmp_path):
+    trace = tmp_path / "trace.json"
+    result = CliRunner().invoke(app, ["--profile", str(trace), "debug", "settings", "--key", "app"])
+    assert result.exit_code == 0, result.output
+    report = json.loads(trace.read_text())
+    assert report["total"] > 0
+    assert isinstance(report["spans"], list)
+
+
+def test_profile_dump_covers_worker_threads(tmp_path):
+    import pstats
+    from tests.test_unzip import make_zip
+    for i in range(2):
+        make_zip(tmp_path / "in" / f"s{i}.zip", {f"a{i}.txt": b"a"})
+    dump = tmp_path / "unzip.prof"
+    args = ["--profile", str(dump), "unzip-all", str(tmp_path / "in"), "--jobs", "2",
+            "--manifest", str(tmp_path / "manifest.jsonl")]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0, result.output
+    # extraction runs on the pool threads only; concurrent calls share the
+    # profiler's stack and may look recursive, so count every call
+    calls = {func[2]: stat[1] for func, stat in pstats.Stats(str(dump)).stats.items()}
+    assert calls.get("_extract_archive") == 2
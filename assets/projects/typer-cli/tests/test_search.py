@@ -0,0 +1,145 @@
+import os
+from pathlib import Path
+from ava.utils import search_files, iter_files
+
+
+def make_tree(root: Path) -> Path:
+    for rel in [
+        "a.py", "b.txt", "src/c.py", "src/d.zip",
+        "node_modules/pkg/e.py", ".git/objects/f.py", "src/deep/g.py",
+    ]:
+        fp = root / rel
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        fp.write_text(rel)
+    return root
+
+
+def test_search_files_patterns_and_ignore_parts(tmp_path):
+    root = make_tree(tmp_path)
+    files = search_files(root, extensions=["*.py", "*.zip"], ignore_parts=["node_modules", ".git"])
+    assert [f.relative_to(root).as_posix() for f in files] == [
+        "a.py", "src/c.py", "src/d.zip", "src/deep/g.py",
+    ]
+
+
+def test_search_files_ignore_extensions_and_keywords(tmp_path):
+    root = make_tree(tmp_path)
+    files = search_files(root, ignore_extensions=[".py"], ignore_parts=[".git"])
+    assert {f.name for f in files} == {"b.txt", "d.zip"}
+    files = search_files(root, extensions=["*.py"], keywords="deep")
+    assert [f.name for f in files] == ["g.py"]
+
+
+def test_iter_files_stops_at_max_files(tmp_path):
+    root = make_tree(tmp_path)
+    stream = search_files(root, extensions=["*.py"], max_files=2, stream=True)
+    assert not isinstance(stream, list)
+    assert len(list(stream)) == 2
+    assert len(list(iter_files(root, ignore_parts=[tmp_path.name]))) == 0
+
+
+def test_parallel_walk_matches_serial(tmp_path):
+    root = make_tree(tmp_path)
+    serial = search_files(root, extensions=["*.py"], ignore_parts=[".git"])
+    parallel = search_files(root, extensions=["*.py"], ignore_parts=[".git"], workers=4)
+    assert parallel == serial
+    assert len(list(iter_files(root, workers=4, max_files=3))) == 3
+
+
+def test_content_matcher(tmp_path):
+    from ava import content
+    from ava.content import ContentMatcher
+    text = tmp_path / "a.txt"
+    text.write_bytes(b"hello world\n" * 10)
+    binary = tmp_path / "b.bin"
+    binary.write_bytes(b"\0hello")
+    big = tmp_path / "big.txt"
+    big.write_bytes(b"x" * (content.CHUNK_SIZE + 5) + b"needle")
+
+    assert ContentMatcher(["nope", "world"]).match(text)
+    assert not ContentMatcher("hello").match(binary)
+    assert ContentMatcher("hello", skip_binary=False).match(binary)
+    assert ContentMatcher(regex=r"hel+o\s+w").match(text)
+    assert ContentMatcher("needle").match(big)
+    assert not ContentMatcher("needle", max_size=100).match(big)
+    chunked = ContentMatcher("needle")
+    with open(big, 'rb') as f:
+        assert chunked._search_chunks(f)
+
+
+def test_empty_keywords_are_rejected_or_dropped(tmp_path):
+    import pytest
+    from typer.testing import CliRunner
+    from ava.app_cli import app
+    from ava.content import ContentMatcher
+    root = make_tree(tmp_path)
+    with pytest.raises(ValueError):
+        ContentMatcher([""])
+    # an empty keyword is no content filter
+    assert search_files(root, keywords=[""]) == search_files(root)
+    assert [f.name for f in search_files(root, keywords=["", "deep"])] == ["g.py"]
+    result = CliRunner().invoke(app, ["search", str(root), "-k", ""])
+    assert result.exit_code == 2
+    assert "keywords cannot be empty" in result.output
+
+
+def test_search_files_regex_with_workers(tmp_path):
+    root = make_tree(tmp_path)
+    files = search_files(root, regex=r"src/(c|deep)", workers=3)
+    assert [f.name for f in files] == ["c.py", "g.py"]
+
+
+def test_search_files_from_index(tmp_path):
+    from ava.index import FileIndex
+    root = make_tree(tmp_path / "tree")
+    db = tmp_path / "index.db"
+    with FileIndex(root, db_path=db) as index:
+        index.build()
+        criterias = dict(extensions=["*.py"], ignore_parts=["node_modules", ".git"])
+        walked = [str(f) for f in search_files(root, **criterias)]
+        assert list(index.query(**criterias)) == walked
+
+        (root / "src" / "new.py").write_text("new")
+        (root / "src" / "deep" / "g.py").unlink()
+        stats = index.refresh()
+        assert stats.scanned == 2
+        names = [os.path.basename(p) for p in index.query(**criterias)]
+        assert names == ["a.py", "c.py", "new.py"]
+        assert len(list(index.query(max_files=2))) == 2
+
+
+def test_write_paths_machine_formats(capfdbinary):
+    from ava.output import OutputFormat, write_paths
+    paths = iter([Path("/a/b.zip"), Path("/c d/e.zip")])
+    assert write_paths(paths, OutputFormat.null0) == 2
+    assert capfdbinary.readouterr().out == b"/a/b.zip\0/c d/e.zip\0"
+    write_paths([Path("/a/b.zip")], OutputFormat.ndjson)
+    assert capfdbinary.readouterr().out == b'{"path": "/a/b.zip"}\n'
+    write_paths([Path("/c,d")], OutputFormat.csv)
+    assert capfdbinary.readouterr().out.splitlines() == [b"path", b'"/c,d"']
+
+
+def test_write_paths_flushes_each_record():
+    import os
+    import sys
+    import select
+    import subprocess
+    # the walk only goes on once the reader has the first record
+    script = (
+        "import sys; from pathlib import Path; from ava.output import OutputFormat, write_paths\n"
+        "def walk():\n"
+        "    yield Path('/a.zip')\n"
+        "    sys.stdin.readline()\n"
+        "    yield Path('/b.zip')\n"
+        "write_paths(walk(), OutputFormat.ndjson)\n"
+    )
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONUNBUFFERED"}
+    proc = subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env)
+    try:
+        ready, _, _ = select.select([proc.stdout], [], [], 10)
+        assert ready, "first record still buffered"
+        assert proc.stdout.readline() == b'{"path": "/a.zip"}\n'
+        out, _ = proc.communicate(b"\n", timeout=10)
+    finally:
+        proc.kill()
+    assert out == b'{"path": "/b.zip"}\n'
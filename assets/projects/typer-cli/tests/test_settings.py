@@ -0,0 +1,55 @@
+import pytest
+from ava import config
+from ava.config import ToolSettings, load_settings
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config.context, "USER_CONFIG_PATH", tmp_path)
+    return tmp_path
+
+
+def test_settings_snapshot_cache(config_dir, monkeypatch):
+    fresh = load_settings()
+    assert (config_dir / config.SETTINGS_CACHE_FILENAME).exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("settings were resolved again")
+    monkeypatch.setattr(ToolSettings, "__init__", fail)
+    cached = load_settings()
+    assert cached.model_dump() == fresh.model_dump()
+    assert cached.resources.data.path == fresh.resources.data.path
+
+    with pytest.raises(AssertionError):
+        load_settings(use_cache=False)
+
+
+def test_settings_cache_invalidated_by_env(config_dir, monkeypatch):
+    assert load_settings().app.verbose is False
+    monkeypatch.setenv("ava_app_verbose", "true")
+    assert load_settings().app.verbose is True
+
+
+def test_settings_index(config_dir):
+    from ava.settings_index import SettingsIndex
+    settings = load_settings()
+    index = SettingsIndex(settings)
+    assert index.get("resources.data.path") == settings.resources.data.path
+    assert index.get("app.verbose") is False
+    # computed fields are indexed too
+    assert index.get("project.name") == settings.project.name
+    assert index.get("resources.data") == {
+        "path_dir": settings.resources.data.path_dir,
+        "path": settings.resources.data.path,
+    }
+    assert "unzip" in index.keys()
+    assert index.keys("app") == [
+        "logger_enabled", "verbose", "log_level", "log_stderr_level", "log_file", "log_rate",
+    ]
+    # leaves have no children
+    assert index.get("resources.data.path.name") is None
+    with pytest.raises(KeyError):
+        index.keys("app.verbose")
+    assert set(index.glob("resources.*.path")) == {"resources.data.path", "resources.assigns.path"}
+    assert "unzip.max_ratio" in index.glob("unzip.**")
+    assert index.query("resources.*.nope") == {}
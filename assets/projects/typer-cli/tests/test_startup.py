@@ -0,0 +1,81 @@
+import sys
+import ast
+import subprocess
+import importlib.util
+
+# cumulative import time allowed for `ava version`: measured ~300ms, of which
+# `import typer` (click, rich) is ~220ms; the rest leaves room for a noisy machine
+STARTUP_BUDGET_US = 400_000
+# modules only commands that need settings (or print) may import
+LAZY_MODULES = ("pydantic", "pydantic_settings", "loguru", "rich", "ava.config", "ava.cli.debug")
+
+RUN_VERSION = "import sys; sys.argv = ['ava', 'version']; from ava.app_cli import main; main()"
+
+
+def import_times(code: str = RUN_VERSION) -> dict[str, int]:
+    """ cumulative import time (us) per module of `ava version` """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_version_skips_settings_and_command_groups():
+    times = import_times()
+    # typer imports rich itself when it is installed (typer.core)
+    typer_modules = import_times("import typer")
+    loaded = [name for name in times if name.startswith(LAZY_MODULES) and name not in typer_modules]
+    assert loaded == []
+
+
+def test_version_path_has_no_module_level_rich_import():
+    # rich is loaded by typer first, so import times cannot show ava's own
+    # imports of it: check the source of every ava module `ava version` loads
+    offenders = []
+    for name in import_times():
+        if not name.startswith("ava"):
+            continue
+        tree = ast.parse(open(importlib.util.find_spec(name).origin, encoding="utf-8").read())
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                modules = [node.module or ""]
+            else:
+                continue
+            offenders += [f"{name}:{node.lineno}" for module in modules if module.split(".")[0] == "rich"]
+    assert offenders == []
+
+
+def test_startup_budget():
+    times = import_times()
+    assert times["ava.app_cli"] < STARTUP_BUDGET_US
+
+
+def test_debug_settings_no_cache_loads_settings_once(tmp_path):
+    import os
+    # record each settings load: True reads the snapshot cache
+    run = (
+        "import sys; from ava import config\n"
+        "loads, load = [], config._load_settings\n"
+        "config._load_settings = lambda use_cache: loads.append(use_cache) or load(use_cache)\n"
+        "sys.argv = ['ava', 'debug', 'settings', '--no-cache', '--quiet']\n"
+        "from ava.app_cli import main\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(loads)\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", run], env={**os.environ, "HOME": str(tmp_path)},
+        capture_output=True, text=True, check=True,
+    )
+    assert proc.stdout.strip().splitlines()[-1] == "[False]"
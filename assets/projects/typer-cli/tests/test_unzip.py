@@ -1,3 +1,197 @@
+import zipfile
+from pathlib import Path
+from ava.extract import extract_archives, ByteBudget
+
+
+def make_zip(path: Path, members: dict[str, bytes], compression=zipfile.ZIP_DEFLATED) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, 'w', compression=compression) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return path
+
+
+def corrupt_deflate(path: Path, name: str) -> Path:
+    """ Overwrite the first byte of a deflated member: block type 3 is reserved (zlib.error) """
+    with zipfile.ZipFile(path) as zf:
+        info = zf.getinfo(name)
+    data = bytearray(path.read_bytes())
+    data[info.header_offset + 30 + len(info.filename.encode())] = 0xFF
+    path.write_bytes(data)
+    return path
+
 
 def test_unzip_all():
     assert (1,2) == (1,2)
+
+
+def test_extract_archives_parallel(tmp_path):
+    archives = [
+        make_zip(tmp_path / f"course{i}" / f"sub{i}.zip", {f"a{i}.txt": b"x" * 100, "b/c.txt": b"y"})
+        for i in range(6)
+    ]
+    results = []
+    stats = extract_archives(iter(archives), jobs=3, max_inflight=1, on_result=results.append)
+    assert stats.archives == 6
+    assert stats.failed == 0
+    assert stats.files == 12
+    assert stats.bytes == 6 * 101
+    assert {r.archive for r in results} == set(archives)
+    for i in range(6):
+        assert (tmp_path / f"course{i}" / f"a{i}.txt").read_bytes() == b"x" * 100
+
+
+def test_extract_archives_reports_bad_archive(tmp_path):
+    bad = tmp_path / "bad.zip"
+    bad.write_bytes(b"not a zip")
+    stats = extract_archives([bad], jobs=2)
+    assert stats.archives == 1
+    assert stats.failed == 1
+
+
+def test_extract_archives_survives_corrupt_deflate_stream(tmp_path):
+    bad = corrupt_deflate(make_zip(tmp_path / "bad" / "bad.zip", {"a.txt": b"x" * 1000}), "a.txt")
+    good = make_zip(tmp_path / "good" / "good.zip", {"a.txt": b"x" * 1000})
+    results = []
+    stats = extract_archives([bad, good], jobs=2, on_result=results.append)
+    assert (stats.archives, stats.failed) == (2, 1)
+    failed = next(r for r in results if not r.ok)
+    assert failed.archive == bad and "error" in failed.error
+    assert (tmp_path / "good" / "a.txt").read_bytes() == b"x" * 1000
+    assert not (tmp_path / "bad" / "a.txt").exists()
+
+
+def test_byte_budget_admits_oversized_when_idle():
+    budget = ByteBudget(limit=10)
+    budget.acquire(100)
+    assert budget.inflight == 100
+    budget.release(100)
+    assert budget.inflight == 0
+
+
+def test_manifest_skips_unchanged_and_prunes(tmp_path):
+    from ava.manifest import ExtractManifest
+    from ava.extract import extract_archive
+    archive = make_zip(tmp_path / "src" / "a.zip", {"dir/a.txt": b"a"})
+    manifest = ExtractManifest(tmp_path / "manifest.jsonl")
+    assert not manifest.is_current(archive)
+
+    result = extract_archive(archive)
+    manifest.record(result.archive, result.dest, result.outputs)
+    assert ExtractManifest(tmp_path / "manifest.jsonl").is_current(archive)
+
+    archive.unlink()
+    manifest = ExtractManifest(tmp_path / "manifest.jsonl")
+    missing = manifest.missing(tmp_path)
+    assert [e["archive"] for e in missing] == [str(archive)]
+    assert manifest.prune(missing[0]) == 1
+    assert not (tmp_path / "src" / "dir").exists()
+    assert ExtractManifest(tmp_path / "manifest.jsonl").entries == {}
+
+
+def test_extract_tarballs_by_magic(tmp_path):
+    import io
+    import tarfile
+    from ava.extract import extract_archive
+    from ava.extractors import detect_extractor, TarExtractor, ZipExtractor
+    for mode, name in [("w:gz", "a.tar.gz"), ("w:xz", "b.tar.xz"), ("w", "c.tar")]:
+        # misleading suffix: the backend is picked by content
+        archive = tmp_path / f"{name}.bin"
+        with tarfile.open(archive, mode) as tar:
+            data = name.encode()
+            info = tarfile.TarInfo(f"{name}/../../evil/{name}.txt")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        assert detect_extractor(archive) is TarExtractor
+        result = extract_archive(archive, tmp_path / "out")
+        assert result.ok, result.error
+        assert result.files == 1
+        assert (tmp_path / "out" / name / "evil" / f"{name}.txt").read_text() == name
+    assert detect_extractor(make_zip(tmp_path / "z.data", {"a": b"a"})) is ZipExtractor
+
+
+def test_extract_unsupported_format(tmp_path):
+    from ava.extract import extract_archive
+    archive = tmp_path / "x.rar"
+    archive.write_bytes(b"plain text")
+    result = extract_archive(archive)
+    assert not result.ok
+
+
+def test_guard_aborts_without_partial_output(tmp_path):
+    from ava.extract import extract_archive
+    from ava.extractors import ExtractLimits
+    bomb = make_zip(tmp_path / "bomb.zip", {"a.txt": b"a", "zeros.bin": b"\0" * 1_000_000})
+    out = tmp_path / "out"
+
+    result = extract_archive(bomb, out, ExtractLimits(max_ratio=50))
+    assert "ExtractAborted" in result.error
+    assert list(out.iterdir()) == []
+
+    result = extract_archive(bomb, out, ExtractLimits(max_members=1))
+    assert not result.ok
+
+    nested = make_zip(tmp_path / "nested.zip", {"inner.zip": b"PK"})
+    assert not extract_archive(nested, out, ExtractLimits(reject_nested=True)).ok
+
+    assert extract_archive(bomb, out, ExtractLimits(max_total_bytes=2_000_000)).ok
+    assert sorted(p.name for p in out.iterdir()) == ["a.txt", "zeros.bin"]
+
+
+def test_guard_running_counter_catches_lying_sizes(tmp_path):
+    import io
+    import pytest
+    from ava.extractors import ExtractGuard, ExtractLimits, ExtractAborted, Member, copy_stream
+    guard = ExtractGuard(ExtractLimits(max_member_bytes=10), archive_size=100)
+    guard.check_listing([Member("a", size=5)])
+    guard.start_member(Member("a", size=5))
+    with pytest.raises(ExtractAborted):
+        copy_stream(io.BytesIO(b"x" * 100), tmp_path / "a", guard, chunk_size=4)
+
+
+def test_dedup_links_identical_members(tmp_path):
+    from ava.dedup import ContentStore
+    shared = b"asset" * 1000
+    archives = [
+        make_zip(tmp_path / f"s{i}" / "sub.zip", {"img/logo.png": shared, "own.txt": f"{i}".encode()})
+        for i in range(3)
+    ]
+    store = ContentStore(tmp_path / "store")
+    stats = extract_archives(archives, jobs=2, store=store)
+    assert stats.failed == 0
+    assert store.stats.files == 6
+    assert store.stats.duplicates == 2
+    assert store.stats.bytes_saved == 2 * len(shared)
+    logos = [tmp_path / f"s{i}" / "img" / "logo.png" for i in range(3)]
+    assert all(p.read_bytes() == shared for p in logos)
+    assert len({p.stat().st_ino for p in logos}) == 1
+
+    assert store.same_filesystem(tmp_path)
+    # s0/own.txt is only linked from the store once s0 is removed
+    for path in (tmp_path / "s0").rglob("*"):
+        path.is_file() and path.unlink()
+    assert store.gc(dry_run=True) == (1, 1)
+    assert store.gc() == (1, 1)
+    assert all(p.read_bytes() == shared for p in logos[1:])
+    assert store.gc() == (0, 0)
+
+
+def test_unzip_all_survives_archive_removed_before_recording(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from ava.app_cli import app
+    from ava.manifest import ExtractManifest
+    gone = make_zip(tmp_path / "in" / "a.zip", {"a.txt": b"a"})
+    make_zip(tmp_path / "in" / "b.zip", {"b.txt": b"b"})
+    record = ExtractManifest.record
+
+    def removed_first(self, archive, dest, outputs):
+        if archive == gone:
+            archive.unlink()
+        return record(self, archive, dest, outputs)
+    monkeypatch.setattr(ExtractManifest, "record", removed_first)
+    manifest = tmp_path / "manifest.jsonl"
+    result = CliRunner().invoke(app, ["unzip-all", str(tmp_path / "in"), "--manifest", str(manifest)])
+    assert result.exit_code == 0, result.output
+    assert "Not recorded" in result.output
+    assert (tmp_path / "in" / "b.txt").exists()
+    assert list(ExtractManifest(manifest).entries) == [str((tmp_path / "in" / "b.zip").absolute())]
@@ -0,0 +1,67 @@
+import zipfile
+from pathlib import Path
+from tests.test_unzip import make_zip, corrupt_deflate
+from ava.verify import check_archives, list_archive, verify_archive, quarantine
+
+
+def test_list_archive_reads_central_directory(tmp_path):
+    archive = make_zip(tmp_path / "a.zip", {"small.txt": b"x" * 10, "dir/big.bin": b"y" * 5000})
+    report = list_archive(archive)
+    assert report.ok and report.format == "zip"
+    assert (report.files, report.size) == (2, 5010)
+    assert (report.largest, report.largest_size) == ("dir/big.bin", 5000)
+    assert report.compressed < report.size
+    assert not report.checked
+
+
+def test_verify_and_quarantine(tmp_path):
+    root = tmp_path / "intake"
+    good = [make_zip(root / f"c{i}" / "good.zip", {"a.txt": b"hello " * 100}) for i in range(3)]
+    bad = make_zip(root / "c9" / "bad.zip", {"a.txt": b"hello world " * 100}, compression=zipfile.ZIP_STORED)
+    data = bytearray(bad.read_bytes())
+    data[60] ^= 0xFF
+    bad.write_bytes(data)
+    truncated = root / "trunc.zip"
+    truncated.write_bytes(good[0].read_bytes()[:40])
+
+    archives = [*good, bad, truncated]
+    reports = list(check_archives(archives, verify_archive, jobs=2))
+    assert [r.archive for r in reports] == [str(a) for a in archives]
+    assert [r.ok for r in reports] == [True, True, True, False, False]
+    assert "bad CRC" in reports[3].error
+    assert "BadZipFile" in reports[4].error
+
+    quarantine(reports[3], tmp_path / "quarantine", root)
+    assert not bad.exists()
+    assert (tmp_path / "quarantine" / "c9" / "bad.zip").exists()
+    assert reports[3].quarantined == str(tmp_path / "quarantine" / "c9" / "bad.zip")
+
+
+def test_verify_corrupt_deflate_stream(tmp_path):
+    good = make_zip(tmp_path / "good.zip", {"a.txt": b"hello " * 100})
+    bad = corrupt_deflate(make_zip(tmp_path / "bad.zip", {"a.txt": b"hello " * 100}), "a.txt")
+    reports = list(check_archives([bad, good], verify_archive, jobs=2, processes=False))
+    assert [r.ok for r in reports] == [False, True]
+    assert "Error -3" in reports[0].error
+
+
+def test_failed_quarantine_does_not_stop_the_report(tmp_path):
+    import json
+    from typer.testing import CliRunner
+    from ava.app_cli import app
+    root = tmp_path / "intake"
+    bad = [root / name for name in ("a.zip", "b.zip")]
+    for archive in bad:
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        archive.write_bytes(b"not a zip")
+    # a.zip was already quarantined by an earlier run
+    (tmp_path / "quarantine").mkdir()
+    (tmp_path / "quarantine" / "a.zip").write_bytes(b"earlier")
+    args = ["zip", "verify", str(root), "--quarantine", str(tmp_path / "quarantine"), "--format", "ndjson", "--jobs", "1"]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 1
+    reports = {Path(r["archive"]).name: r for r in map(json.loads, result.output.splitlines())}
+    assert reports["a.zip"]["quarantined"] is None
+    assert "not quarantined: FileExistsError" in reports["a.zip"]["error"]
+    assert bad[0].exists() and (tmp_path / "quarantine" / "a.zip").read_bytes() == b"earlier"
+    assert reports["b.zip"]["quarantined"] == str(tmp_path / "quarantine" / "b.zip")
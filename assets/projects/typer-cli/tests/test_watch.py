@@ -0,0 +1,84 @@
+import time
+import threading
+import pytest
+from ava.utils import compile_patterns
+from ava.watch import ArchiveWatcher
+
+
+def collect(watcher, seconds):
+    found = []
+    deadline = time.monotonic() + seconds
+    for path in watcher:
+        if path is not None:
+            found.append(path)
+        if time.monotonic() > deadline:
+            return found
+
+
+@pytest.mark.parametrize("polling", [False, True])
+def test_watcher_debounces_uploads(tmp_path, polling):
+    (tmp_path / "old.zip").write_bytes(b"old")
+    with ArchiveWatcher(
+            tmp_path,
+            compile_patterns(["*.zip"]).match,
+            settle=0.3,
+            poll_interval=0.1,
+            polling=polling,
+            ignore_prefix=".ava-extract-",
+        ) as watcher:
+        assert watcher.backend == ("polling" if polling else "inotify")
+
+        def upload():
+            (tmp_path / "course" / ".ava-extract-x").mkdir(parents=True)
+            (tmp_path / "course" / ".ava-extract-x" / "inner.zip").write_bytes(b"staged")
+            (tmp_path / "notes.txt").write_text("x")
+            # a slow upload: written in parts, closed in between
+            part = tmp_path / "course" / "sub.zip"
+            for _ in range(3):
+                with open(part, "ab") as f:
+                    f.write(b"x" * 100)
+                time.sleep(0.1)
+
+        threading.Timer(0.1, upload).start()
+        found = collect(watcher, 2.0)
+    assert found == [tmp_path / "course" / "sub.zip"]
+
+
+class StoppingWatcher(ArchiveWatcher):
+    """ Ends the watch after a while instead of waiting for Ctrl-C """
+    def __iter__(self):
+        deadline = time.monotonic() + 1.0
+        for path in super().__iter__():
+            yield path
+            if time.monotonic() > deadline:
+                return
+
+
+@pytest.mark.parametrize("watch", [False, True])
+def test_nested_archives_are_left_in_both_modes(tmp_path, monkeypatch, watch):
+    import io
+    import zipfile
+    from typer.testing import CliRunner
+    from ava.app_cli import app
+    inner = io.BytesIO()
+    with zipfile.ZipFile(inner, "w") as zf:
+        zf.writestr("inner.txt", "x")
+    with zipfile.ZipFile(tmp_path / "outer.zip", "w") as zf:
+        zf.writestr("sub/inner.zip", inner.getvalue())
+
+    monkeypatch.setattr("ava.watch.ArchiveWatcher", StoppingWatcher)
+    args = ["unzip-all", str(tmp_path), "--manifest", str(tmp_path / "manifest.jsonl")]
+    if watch:
+        args += ["--watch", "--settle", "0.2"]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "sub" / "inner.zip").exists()
+    assert not (tmp_path / "sub" / "inner.txt").exists()
+
+
+def test_watch_rejects_dry_run(tmp_path):
+    from typer.testing import CliRunner
+    from ava.app_cli import app
+    result = CliRunner().invoke(app, ["unzip-all", str(tmp_path), "--watch", "--dry"])
+    assert result.exit_code == 2
+    assert "--dry" in result.output